@@ -2,17 +2,18 @@
 
 import logging
 import os
-import json
+import orjson
+from dataclasses import replace
 from pathlib import Path
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QToolBar,
     QLabel, QSpinBox, QDoubleSpinBox, QPushButton,
-    QColorDialog, QFileDialog, QMessageBox, QStatusBar, QSplitter,
+    QColorDialog, QFileDialog, QInputDialog, QMessageBox, QStatusBar, QSplitter,
     QFrame, QMenu, QGroupBox, QFormLayout, QDialog, QDialogButtonBox,
     QLineEdit, QListWidget, QListWidgetItem, QApplication, QCheckBox
 )
 from PySide6.QtCore import Qt, QSettings, QTimer, Signal, QEvent
-from PySide6.QtGui import QAction, QIcon, QColor, QKeySequence, QFont, QShortcut
+from PySide6.QtGui import QAction, QIcon, QColor, QKeySequence, QShortcut
 from typing import Optional
 import fitz
 
@@ -86,20 +87,7 @@ class StylePresetDialog(QDialog):
             QMessageBox.warning(self, tr("Error"), tr("Please enter a name for the preset."))
             return
 
-        style = NumberStyle(**{
-            'name': name,
-            'font_family': self.current_style.font_family,
-            'font_size': self.current_style.font_size,
-            'text_color': self.current_style.text_color,
-            'bg_color': self.current_style.bg_color,
-            'bg_opacity': self.current_style.bg_opacity,
-            'padding': self.current_style.padding,
-            'border_enabled': self.current_style.border_enabled,
-            'border_width': self.current_style.border_width,
-            'tail_enabled': self.current_style.tail_enabled,
-            'tail_length': self.current_style.tail_length,
-            'tail_width': self.current_style.tail_width,
-        })
+        style = replace(self.current_style, name=name)
         self.presets.save(style)
         self._populate_list()
         self.name_edit.clear()
@@ -528,16 +516,16 @@ class MainWindow(QMainWindow):
         if presets_json:
             try:
                 self._presets.from_json(presets_json)
-            except (json.JSONDecodeError, TypeError, KeyError) as e:
+            except (orjson.JSONDecodeError, TypeError, KeyError) as e:
                 logger.warning("Failed to load style presets: %s", e)
 
         # Current style
         style_json = self._settings.value("current_style")
         if style_json:
             try:
-                data = json.loads(style_json)
+                data = orjson.loads(style_json)
                 self._style = NumberStyle.from_dict(data)
-            except (json.JSONDecodeError, TypeError, KeyError) as e:
+            except (orjson.JSONDecodeError, TypeError, KeyError) as e:
                 logger.warning("Failed to load saved style: %s", e)
 
     def _save_settings(self):
@@ -545,7 +533,7 @@ class MainWindow(QMainWindow):
         self._settings.setValue("geometry", self.saveGeometry())
         self._settings.setValue("recent_files", self._recent_files)
         self._settings.setValue("style_presets", self._presets.to_json())
-        self._settings.setValue("current_style", json.dumps(self._style.to_dict()))
+        self._settings.setValue("current_style", orjson.dumps(self._style.to_dict()).decode())
         self._settings.setValue("language", Translator.get_language())
 
     def _set_language(self, lang: str):
@@ -562,7 +550,7 @@ class MainWindow(QMainWindow):
 
     def _save_style_as_default(self):
         """Save current style settings as default."""
-        self._settings.setValue("current_style", json.dumps(self._style.to_dict()))
+        self._settings.setValue("current_style", orjson.dumps(self._style.to_dict()).decode())
         self._statusbar.showMessage(tr("Current style saved as default"))
 
     def _reset_style_to_defaults(self):
@@ -678,7 +666,7 @@ class MainWindow(QMainWindow):
             self._on_page_changed(0)
 
             # Show message about loaded annotations
-            num_annotations = len(self._viewer.get_annotations().all())
+            num_annotations = self._viewer.get_annotations().count()
             if num_annotations > 0:
                 self._statusbar.showMessage(f"{tr('Opened:')} {os.path.basename(path)} ({num_annotations} {tr('annotations')})")
             else:
@@ -819,20 +807,8 @@ class MainWindow(QMainWindow):
         self._tail_length_spin.setValue(style.tail_length)
         self._tail_width_spin.setValue(style.tail_width)
 
-        # Update internal style
-        self._style = NumberStyle(
-            name=style.name,
-            font_size=style.font_size,
-            text_color=style.text_color,
-            bg_color=style.bg_color,
-            bg_opacity=style.bg_opacity,
-            padding=style.padding,
-            border_enabled=style.border_enabled,
-            border_width=style.border_width,
-            tail_enabled=style.tail_enabled,
-            tail_length=style.tail_length,
-            tail_width=style.tail_width
-        )
+        # Update internal style (styles are immutable, so share it)
+        self._style = style
 
         self._size_spin.blockSignals(False)
         self._opacity_spin.blockSignals(False)
@@ -992,7 +968,7 @@ class MainWindow(QMainWindow):
             new_num = old_num + 'p'
             status = f"{tr('Toggled empty on')} #{new_num}"
 
-        annotation.number = new_num
+        self._viewer.get_annotations().set_number(annotation, new_num)
 
         # Update PDF annotation
         self._viewer.update_pdf_annotation(annotation)
@@ -1025,20 +1001,23 @@ class MainWindow(QMainWindow):
 
     def _on_style_changed(self):
         """Handle style settings changed."""
-        self._style.font_size = self._size_spin.value()
-        self._style.bg_opacity = self._opacity_spin.value()
-        self._style.border_enabled = self._border_check.isChecked()
-        self._style.border_width = self._border_width_spin.value()
-        self._style.tail_enabled = self._tail_check.isChecked()
-        self._style.tail_length = self._tail_length_spin.value()
-        self._style.tail_width = self._tail_width_spin.value()
+        self._style = replace(
+            self._style,
+            font_size=self._size_spin.value(),
+            bg_opacity=self._opacity_spin.value(),
+            border_enabled=self._border_check.isChecked(),
+            border_width=self._border_width_spin.value(),
+            tail_enabled=self._tail_check.isChecked(),
+            tail_length=self._tail_length_spin.value(),
+            tail_width=self._tail_width_spin.value(),
+        )
         self._viewer.set_style(self._style)
 
     def _choose_text_color(self):
         """Open color picker for text color."""
         color = QColorDialog.getColor(QColor(self._style.text_color), self)
         if color.isValid():
-            self._style.text_color = color.name()
+            self._style = replace(self._style, text_color=color.name())
             self._text_color_btn.setStyleSheet(f"background-color: {color.name()};")
             self._on_style_changed()
 
@@ -1046,7 +1025,7 @@ class MainWindow(QMainWindow):
         """Open color picker for background color."""
         color = QColorDialog.getColor(QColor(self._style.bg_color), self)
         if color.isValid():
-            self._style.bg_color = color.name()
+            self._style = replace(self._style, bg_color=color.name())
             self._bg_color_btn.setStyleSheet(f"background-color: {color.name()};")
             self._on_style_changed()
 
@@ -1057,17 +1036,12 @@ class MainWindow(QMainWindow):
         if not annotation:
             return
 
-        # Apply current style settings
-        annotation.style.font_family = self._style.font_family
-        annotation.style.font_size = self._style.font_size
-        annotation.style.text_color = self._style.text_color
-        annotation.style.bg_color = self._style.bg_color
-        annotation.style.bg_opacity = self._style.bg_opacity
-        annotation.style.border_enabled = self._style.border_enabled
-        annotation.style.border_width = self._style.border_width
-        annotation.style.tail_enabled = self._style.tail_enabled
-        annotation.style.tail_length = self._style.tail_length
-        annotation.style.tail_width = self._style.tail_width
+        # Apply current style settings (keeping the annotation's name and padding)
+        annotation.style = replace(
+            self._style,
+            name=annotation.style.name,
+            padding=annotation.style.padding,
+        )
 
         # Update PDF annotation (delete old, create new with new style)
         self._viewer.update_pdf_annotation(annotation)
@@ -1157,13 +1131,13 @@ class MainWindow(QMainWindow):
             # Auto-advance all numbers >= number
             changes = annotations.advance_numbers_from(number, 1)
 
-            # Update PDF annotations for all changed numbers
-            for changed_ann, _, _ in changes:
-                self._viewer.update_pdf_annotation(changed_ann)
+            with self._viewer.bulk_update():
+                # Update PDF annotations for all changed numbers
+                for changed_ann, _, _ in changes:
+                    self._viewer.update_pdf_annotation(changed_ann)
 
-            # Now insert the annotation with the original number
-            self._viewer.insert_annotation_at(pdf_x, pdf_y, number)
-            self._viewer.refresh_page()
+                # Now insert the annotation with the original number
+                self._viewer.insert_annotation_at(pdf_x, pdf_y, number)
             self._refresh_annotation_panel()
             self._statusbar.showMessage(f"{tr('Inserted')} #{number}, {tr('advanced')} {len(changes)} {tr('others')}")
 
@@ -1176,7 +1150,9 @@ class MainWindow(QMainWindow):
 
     def _jump_to_annotation(self, annotation: NumberAnnotation):
         """Jump to an annotation's location."""
-        self._viewer.go_to_page(annotation.page)
+        # Selecting on the shown page only moves the selection overlay
+        if annotation.page != self._viewer.current_page():
+            self._viewer.go_to_page(annotation.page)
         self._viewer.select_annotation(annotation)
         self._viewer.center_on_annotation(annotation)
 
@@ -1187,8 +1163,6 @@ class MainWindow(QMainWindow):
 
     def _change_annotation_number(self, annotation: NumberAnnotation):
         """Show dialog to change an annotation's number."""
-        from PySide6.QtWidgets import QInputDialog
-
         annotations = self._viewer.get_annotations()
         current_num = annotation.number
 
@@ -1242,7 +1216,7 @@ class MainWindow(QMainWindow):
             for changed_ann, _, _ in changes:
                 self._viewer.update_pdf_annotation(changed_ann)
 
-            annotation.number = new_num
+            annotations.set_number(annotation, new_num)
             self._viewer.update_pdf_annotation(annotation)
 
             self._viewer.refresh_page()
@@ -1259,7 +1233,7 @@ class MainWindow(QMainWindow):
     def _do_change_number(self, annotation: NumberAnnotation, new_num: str):
         """Actually change an annotation's number."""
         old_num = annotation.number
-        annotation.number = new_num
+        self._viewer.get_annotations().set_number(annotation, new_num)
 
         # Update PDF annotation (delete old, create new with new number)
         self._viewer.update_pdf_annotation(annotation)
@@ -1282,7 +1256,7 @@ class MainWindow(QMainWindow):
 
     def _restore_number(self, annotation: NumberAnnotation, number: str):
         """Restore an annotation's number (for undo/redo)."""
-        annotation.number = number
+        self._viewer.get_annotations().set_number(annotation, number)
 
         # Update PDF annotation
         self._viewer.update_pdf_annotation(annotation)
@@ -1315,12 +1289,12 @@ class MainWindow(QMainWindow):
                 # First collect changes, then delete and apply
                 changes = annotations.decrease_numbers_from(annotation.number, 1)
 
-                # Update PDF annotations for all changed numbers
-                for changed_ann, _, _ in changes:
-                    self._viewer.update_pdf_annotation(changed_ann)
+                with self._viewer.bulk_update():
+                    # Update PDF annotations for all changed numbers
+                    for changed_ann, _, _ in changes:
+                        self._viewer.update_pdf_annotation(changed_ann)
 
-                self._viewer.delete_annotation(annotation)
-                self._viewer.refresh_page()
+                    self._viewer.delete_annotation(annotation)
                 self._refresh_annotation_panel()
                 self._update_title()
                 self._statusbar.showMessage(f"{tr('Deleted')} #{annotation.number}, {tr('decreased')} {len(changes)} {tr('others')}")
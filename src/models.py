@@ -1,24 +1,36 @@
 """Data models for annotations and styles."""
 
-from dataclasses import dataclass, field, asdict
-from typing import Optional
-import json
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field, fields, replace
+from functools import lru_cache
+from itertools import count
+from typing import Optional, Union
+import orjson
+import sys
 import uuid
-import re
 
 
+# Annotation IDs are a per-session random prefix plus a counter: unique enough
+# to never clash with IDs loaded from saved projects, without a uuid4() per annotation
+_ID_PREFIX = uuid.uuid4().hex[:12]
+_id_counter = count(1)
+
+
+def _next_id() -> str:
+    return f"{_ID_PREFIX}-{next(_id_counter)}"
+
+
+@lru_cache(maxsize=4096)
 def parse_number(num_str: str) -> tuple[int, int]:
     """Parse a number string like '67', '67.1', '67p', or '67.1p' into (main, sub) tuple.
 
     Returns (67, 0) for '67' or '67p' and (67, 1) for '67.1' or '67.1p'
     The 'p' suffix (for "pusty"/empty) is stripped before parsing.
+    Results are cached, as the same few strings are parsed over and over.
     """
     # Strip 'p' suffix if present
-    num_str = str(num_str).rstrip('p')
-    if '.' in num_str:
-        parts = num_str.split('.')
-        return (int(parts[0]), int(parts[1]))
-    return (int(num_str), 0)
+    main, sep, sub = str(num_str).rstrip('p').partition('.')
+    return (int(main), int(sub) if sep else 0)
 
 
 def format_number(main: int, sub: int = 0) -> str:
@@ -44,9 +56,13 @@ def sort_key(num_str: str) -> tuple[int, int]:
     return parse_number(num_str)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NumberStyle:
-    """Style settings for number annotations."""
+    """Style settings for number annotations.
+
+    Immutable so instances can be shared between annotations and presets;
+    use dataclasses.replace() to derive a modified style.
+    """
     name: str = "Default"
     font_family: str = "Arial"
     font_size: int = 24
@@ -60,24 +76,50 @@ class NumberStyle:
     tail_length: int = 100
     tail_width: int = 2
 
+    def __post_init__(self):
+        # Intern the repeated strings (font names, hex colors) so styles share them
+        for name in ('name', 'font_family', 'text_color', 'bg_color'):
+            value = getattr(self, name)
+            if type(value) is str:
+                object.__setattr__(self, name, sys.intern(value))
+
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            'name': self.name,
+            'font_family': self.font_family,
+            'font_size': self.font_size,
+            'text_color': self.text_color,
+            'bg_color': self.bg_color,
+            'bg_opacity': self.bg_opacity,
+            'padding': self.padding,
+            'border_enabled': self.border_enabled,
+            'border_width': self.border_width,
+            'tail_enabled': self.tail_enabled,
+            'tail_length': self.tail_length,
+            'tail_width': self.tail_width,
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> "NumberStyle":
-        # Create with defaults, then update with provided data
-        # This handles missing keys gracefully
-        style = cls()
-        for key, value in data.items():
-            if hasattr(style, key):
-                setattr(style, key, value)
-        return style
+        # Missing keys fall back to defaults, unknown keys are ignored
+        style = cls(**{key: value for key, value in data.items() if key in _STYLE_FIELDS})
+        # Intern so identically-styled annotations loaded from JSON share one instance
+        return _intern_style(style)
+
+
+_STYLE_FIELDS = frozenset(f.name for f in fields(NumberStyle))
+
 
+@lru_cache(maxsize=256)
+def _intern_style(style: NumberStyle) -> NumberStyle:
+    """Return the first-seen instance equal to style (bounded, least recently used dropped)."""
+    return style
 
-@dataclass
+
+@dataclass(slots=True)
 class NumberAnnotation:
     """A number annotation on a PDF page."""
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=_next_id)
     page: int = 0
     x: float = 0.0  # PDF coordinates
     y: float = 0.0
@@ -86,60 +128,180 @@ class NumberAnnotation:
     pdf_annot_xref: int = 0  # PDF annotation xref for direct editing
     pdf_tail_xref: int = 0  # PDF annotation xref for tail line
     pdf_p_xref: int = 0  # PDF annotation xref for small 'p' subscript (empty marker)
+    _sort_key: Optional[tuple[int, int]] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        # Ensure number is always a string
-        self.number = str(self.number)
+        # Ensure number is always a string (interned, the same few recur a lot)
+        self.number = sys.intern(str(self.number))
 
     def to_dict(self) -> dict:
-        data = asdict(self)
-        data['style'] = self.style.to_dict()
-        return data
+        return {
+            'id': self.id,
+            'page': self.page,
+            'x': self.x,
+            'y': self.y,
+            'number': self.number,
+            'style': self.style.to_dict(),
+            'pdf_annot_xref': self.pdf_annot_xref,
+            'pdf_tail_xref': self.pdf_tail_xref,
+            'pdf_p_xref': self.pdf_p_xref,
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> "NumberAnnotation":
-        data = dict(data)  # Avoid mutating caller's dict
-        style_data = data.pop('style', {})
+        style_data = data.get('style')
         style = NumberStyle.from_dict(style_data) if style_data else NumberStyle()
-        # Ensure number is string
-        if 'number' in data:
-            data['number'] = str(data['number'])
-        return cls(style=style, **data)
+        # __post_init__ makes sure number is a string; unknown or legacy keys
+        # (e.g. applied_to_pdf from older saves) are ignored
+        return cls(style=style, **{key: value for key, value in data.items() if key in _ANNOTATION_INIT_FIELDS})
 
     def copy(self) -> "NumberAnnotation":
-        """Create a deep copy of this annotation."""
-        return NumberAnnotation(
-            id=str(uuid.uuid4()),  # New ID for copy
-            page=self.page,
-            x=self.x,
-            y=self.y,
-            number=self.number,
-            style=NumberStyle(**asdict(self.style)),
-        )
+        """Create a copy of this annotation."""
+        # New ID, no PDF annotations yet; the immutable style is shared
+        return replace(self, id=_next_id(), pdf_annot_xref=0, pdf_tail_xref=0, pdf_p_xref=0)
 
     def sort_key(self) -> tuple[int, int]:
-        """Return sort key for ordering."""
-        return parse_number(self.number)
+        """Return sort key for ordering (cached; AnnotationStore.set_number() resets it)."""
+        key = self._sort_key
+        if key is None:
+            key = self._sort_key = parse_number(self.number)
+        return key
 
     def display_number(self) -> str:
         """Return display string for the number."""
         return self.number
 
 
+_ANNOTATION_INIT_FIELDS = frozenset(f.name for f in fields(NumberAnnotation) if f.init and f.name != 'style')
+
+
 class AnnotationStore:
     """Manages all annotations for a document."""
 
     def __init__(self):
         self._annotations: dict[str, NumberAnnotation] = {}
         self._modified = False
+        # Secondary indexes: page -> {id: annotation} and base number (no 'p') -> {id: annotation}
+        self._by_page: dict[int, dict[str, NumberAnnotation]] = {}
+        self._by_base: dict[str, dict[str, NumberAnnotation]] = {}
+        # Number-ordered index, rebuilt lazily after any change to the set of numbers
+        self._sorted: Optional[list[NumberAnnotation]] = None
+        self._sorted_keys: list[tuple[int, int]] = []
+        # Store-order sequence per ID, the index's tie-breaker between equal
+        # numbers (the order sorted() over the store would give them)
+        self._seq: dict[str, int] = {}
+        self._seq_counter = count()
+        self._sorted_seqs: list[int] = []
+
+    def _invalidate_order(self) -> None:
+        self._sorted = None
+
+    def _ensure_sorted(self) -> list[NumberAnnotation]:
+        if self._sorted is None:
+            self._sorted = sorted(self._annotations.values(), key=lambda a: a.sort_key())
+            self._sorted_keys = [a.sort_key() for a in self._sorted]
+            self._sorted_seqs = [self._seq[a.id] for a in self._sorted]
+        return self._sorted
+
+    def _insert_ordered(self, annotation: NumberAnnotation) -> None:
+        """Insert into the number-ordered index in place, if it is built."""
+        if self._sorted is None:
+            return
+        keys = self._sorted_keys
+        key = annotation.sort_key()
+        seq = self._seq[annotation.id]
+        lo = bisect_left(keys, key)
+        i = bisect_left(self._sorted_seqs, seq, lo, bisect_right(keys, key, lo))
+        self._sorted.insert(i, annotation)
+        keys.insert(i, key)
+        self._sorted_seqs.insert(i, seq)
+
+    def _remove_ordered(self, annotation: NumberAnnotation) -> None:
+        """Remove from the number-ordered index in place, if it is built."""
+        if self._sorted is None:
+            return
+        keys = self._sorted_keys
+        key = annotation.sort_key()
+        i = bisect_left(keys, key)
+        while i < len(keys) and keys[i] == key:
+            if self._sorted[i] is annotation:
+                del self._sorted[i]
+                del keys[i]
+                del self._sorted_seqs[i]
+                return
+            i += 1
+        # Not where its key says it should be; rebuild on next use
+        self._invalidate_order()
+
+    def _index_number(self, annotation: NumberAnnotation) -> None:
+        base = annotation.number.rstrip('p')
+        self._by_base.setdefault(base, {})[annotation.id] = annotation
+
+    def _unindex_number(self, annotation: NumberAnnotation) -> None:
+        base = annotation.number.rstrip('p')
+        bucket = self._by_base.get(base)
+        if bucket is not None:
+            bucket.pop(annotation.id, None)
+            if not bucket:
+                del self._by_base[base]
+
+    def _index(self, annotation: NumberAnnotation) -> None:
+        self._by_page.setdefault(annotation.page, {})[annotation.id] = annotation
+        self._index_number(annotation)
+
+    def _unindex(self, annotation: NumberAnnotation) -> None:
+        bucket = self._by_page.get(annotation.page)
+        if bucket is not None:
+            bucket.pop(annotation.id, None)
+            if not bucket:
+                del self._by_page[annotation.page]
+        self._unindex_number(annotation)
+
+    def _reindex(self) -> None:
+        self._by_page.clear()
+        self._by_base.clear()
+        for a in self._annotations.values():
+            self._index(a)
+        self._invalidate_order()
+
+    def _renumber(self, annotation: NumberAnnotation, number: str) -> None:
+        """Assign a new number and move the annotation in the number index."""
+        self._unindex_number(annotation)
+        annotation.number = number
+        annotation._sort_key = None
+        if annotation.id in self._annotations:
+            self._index_number(annotation)
 
     def add(self, annotation: NumberAnnotation) -> None:
+        old = self._annotations.get(annotation.id)
+        if old is not None:
+            self._unindex(old)
+            self._remove_ordered(old)
         self._annotations[annotation.id] = annotation
+        if old is None:
+            self._seq[annotation.id] = next(self._seq_counter)
+        self._index(annotation)
+        self._insert_ordered(annotation)
         self._modified = True
 
     def remove(self, annotation_id: str) -> Optional[NumberAnnotation]:
         self._modified = True
-        return self._annotations.pop(annotation_id, None)
+        annotation = self._annotations.pop(annotation_id, None)
+        if annotation is not None:
+            del self._seq[annotation_id]
+            self._unindex(annotation)
+            self._remove_ordered(annotation)
+        return annotation
+
+    def set_number(self, annotation: NumberAnnotation, number: str) -> None:
+        """Change an annotation's number, keeping the store's indexes in sync."""
+        in_store = annotation.id in self._annotations
+        if in_store:
+            self._remove_ordered(annotation)
+        self._renumber(annotation, str(number))
+        if in_store:
+            self._insert_ordered(annotation)
+        self._modified = True
 
     def get(self, annotation_id: str) -> Optional[NumberAnnotation]:
         return self._annotations.get(annotation_id)
@@ -149,25 +311,30 @@ class AnnotationStore:
 
         Considers base number (without 'p' suffix) for comparison.
         """
-        base_number = str(number).rstrip('p')
-        for a in self._annotations.values():
-            a_base = a.number.rstrip('p')
-            if a_base == base_number:
-                return a
+        bucket = self._by_base.get(str(number).rstrip('p'))
+        if bucket:
+            return next(iter(bucket.values()))
         return None
 
     def get_for_page(self, page: int) -> list[NumberAnnotation]:
-        return [a for a in self._annotations.values() if a.page == page]
+        bucket = self._by_page.get(page)
+        return list(bucket.values()) if bucket else []
 
     def all(self) -> list[NumberAnnotation]:
         return list(self._annotations.values())
 
+    def pages(self) -> set[int]:
+        """Return the page indices that have at least one annotation."""
+        return set(self._by_page)
+
     def all_sorted(self) -> list[NumberAnnotation]:
         """Return all annotations sorted by number."""
-        return sorted(self._annotations.values(), key=lambda a: a.sort_key())
+        return list(self._ensure_sorted())
 
     def clear(self) -> None:
         self._annotations.clear()
+        self._seq.clear()
+        self._reindex()
         self._modified = True
 
     def count(self) -> int:
@@ -181,29 +348,46 @@ class AnnotationStore:
     def modified(self, value: bool):
         self._modified = value
 
-    def to_json(self) -> str:
-        data = [a.to_dict() for a in self._annotations.values()]
-        return json.dumps(data, indent=2)
+    def to_json(self, indent: bool = True) -> str:
+        """Serialize all annotations.
 
-    def from_json(self, json_str: str) -> None:
-        data = json.loads(json_str)
+        Pass indent=False for machine-only snapshots (e.g. PDF metadata),
+        which are smaller and faster to write.
+        """
+        return self.to_json_bytes(indent).decode()
+
+    def to_json_bytes(self, indent: bool = False) -> bytes:
+        """Serialize all annotations to UTF-8 JSON bytes, without a str round trip."""
+        # orjson encodes the dataclasses natively, no to_dict()/asdict() pass needed
+        data = list(self._annotations.values())
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else None)
+
+    def from_json(self, json_str: Union[str, bytes]) -> None:
+        data = orjson.loads(json_str)
         self._annotations.clear()
+        self._seq.clear()
+        self._by_page.clear()
+        self._by_base.clear()
+        # Build and index the annotations in one pass over the decoded items
         for item in data:
             annotation = NumberAnnotation.from_dict(item)
+            old = self._annotations.get(annotation.id)
+            if old is not None:
+                self._unindex(old)
+            else:
+                self._seq[annotation.id] = next(self._seq_counter)
             self._annotations[annotation.id] = annotation
+            self._index(annotation)
+        self._invalidate_order()
         self._modified = True
 
     def get_next_number(self) -> str:
         """Get the next whole number to use (max + 1)."""
         if not self._annotations:
             return "1"
-        # Find max whole number
-        max_main = 0
-        for a in self._annotations.values():
-            main, _ = parse_number(a.number)
-            if main > max_main:
-                max_main = main
-        return str(max_main + 1)
+        # The number-ordered index ends with the highest number
+        self._ensure_sorted()
+        return str(max(self._sorted_keys[-1][0], 0) + 1)
 
     def has_number(self, number: str) -> bool:
         """Check if a number already exists.
@@ -212,23 +396,45 @@ class AnnotationStore:
         E.g., '36' and '36p' are considered the same number.
         """
         # Strip 'p' suffix for comparison
-        base_number = str(number).rstrip('p')
-        for a in self._annotations.values():
-            a_base = a.number.rstrip('p')
-            if a_base == base_number:
-                return True
-        return False
+        return str(number).rstrip('p') in self._by_base
 
     def get_numbers_from(self, number: str) -> list[NumberAnnotation]:
         """Get all annotations with number >= given number (whole numbers only)."""
         target_main, _ = parse_number(number)
-        result = []
-        for a in self._annotations.values():
-            main, sub = parse_number(a.number)
-            # Only include whole numbers (sub == 0) that are >= target
-            if sub == 0 and main >= target_main:
-                result.append(a)
-        return sorted(result, key=lambda a: a.sort_key())
+        ordered = self._ensure_sorted()
+        keys = self._sorted_keys
+        start = bisect_left(keys, (target_main, 0))
+        # Only include whole numbers (sub == 0)
+        return [ordered[i] for i in range(start, len(ordered)) if keys[i][1] == 0]
+
+    def _shift_numbers_from(self, start: int, delta: int) -> list[tuple[NumberAnnotation, str, str]]:
+        """Shift the main number of every annotation from ordered position start on.
+
+        Works on the ordered index, so annotations before start are never
+        looked at and keys come pre-parsed. Preserves 'p' suffix for empty markers.
+        """
+        ordered = self._sorted
+        keys = self._sorted_keys
+        changes = []
+        for i in range(start, len(ordered)):
+            a = ordered[i]
+            main, sub = keys[i]
+            old_num = a.number
+            new_main = main + delta
+            new_num = str(new_main) if sub == 0 else f"{new_main}.{sub}"
+            if old_num.endswith('p'):
+                new_num += 'p'
+            self._renumber(a, new_num)
+            keys[i] = (new_main, sub)
+            changes.append((a, old_num, new_num))
+
+        if changes:
+            # The shifted tail keeps its internal order; only its boundary can break
+            seqs = self._sorted_seqs
+            if start and (keys[start - 1], seqs[start - 1]) > (keys[start], seqs[start]):
+                self._invalidate_order()
+            self._modified = True
+        return changes
 
     def advance_numbers_from(self, from_number: str, delta: int = 1) -> list[tuple[NumberAnnotation, str, str]]:
         """Advance all numbers >= from_number by delta.
@@ -237,32 +443,11 @@ class AnnotationStore:
         Preserves 'p' suffix for empty markers.
         Returns list of (annotation, old_number, new_number) for undo.
         """
-        changes = []
         target_main, _ = parse_number(from_number)
-
-        for a in self._annotations.values():
-            # Check for 'p' suffix
-            has_p = a.number.endswith('p')
-            base_num = a.number[:-1] if has_p else a.number
-            main, sub = parse_number(base_num)
-
-            # Advance if main number >= target
-            if main >= target_main:
-                old_num = a.number
-                new_main = main + delta
-                if sub == 0:
-                    new_num = str(new_main)
-                else:
-                    new_num = f"{new_main}.{sub}"
-                # Preserve 'p' suffix
-                if has_p:
-                    new_num += 'p'
-                a.number = new_num
-                changes.append((a, old_num, new_num))
-
-        if changes:
-            self._modified = True
-        return changes
+        self._ensure_sorted()
+        # Advance if main number >= target
+        start = bisect_left(self._sorted_keys, (target_main, 0))
+        return self._shift_numbers_from(start, delta)
 
     def decrease_numbers_from(self, from_number: str, delta: int = 1) -> list[tuple[NumberAnnotation, str, str]]:
         """Decrease all numbers > from_number by delta.
@@ -271,42 +456,20 @@ class AnnotationStore:
         Preserves 'p' suffix for empty markers.
         Returns list of (annotation, old_number, new_number) for undo.
         """
-        changes = []
         target_main, _ = parse_number(from_number)
-
-        for a in self._annotations.values():
-            # Check for 'p' suffix
-            has_p = a.number.endswith('p')
-            base_num = a.number[:-1] if has_p else a.number
-            main, sub = parse_number(base_num)
-
-            # Decrease if main number > target
-            if main > target_main:
-                old_num = a.number
-                new_main = main - delta
-                if sub == 0:
-                    new_num = str(new_main)
-                else:
-                    new_num = f"{new_main}.{sub}"
-                # Preserve 'p' suffix
-                if has_p:
-                    new_num += 'p'
-                a.number = new_num
-                changes.append((a, old_num, new_num))
-
-        if changes:
-            self._modified = True
-        return changes
+        self._ensure_sorted()
+        # Decrease if main number > target
+        start = bisect_left(self._sorted_keys, (target_main + 1, 0))
+        return self._shift_numbers_from(start, -delta)
 
     def get_next_sub_number(self, base: str) -> str:
         """Get next available sub-number (e.g., 67.1, 67.2)."""
         base_main, _ = parse_number(base)
-        max_sub = 0
-
-        for a in self._annotations.values():
-            main, sub = parse_number(a.number)
-            if main == base_main and sub > max_sub:
-                max_sub = sub
+        self._ensure_sorted()
+        keys = self._sorted_keys
+        # Highest key below the next whole number holds the largest sub-number
+        i = bisect_left(keys, (base_main + 1, 0))
+        max_sub = keys[i - 1][1] if i and keys[i - 1][0] == base_main else 0
 
         return f"{base_main}.{max_sub + 1}"
 
@@ -318,23 +481,18 @@ class AnnotationStore:
         if not self._annotations:
             return []
 
-        # Get all whole numbers
-        whole_numbers = set()
-        for a in self._annotations.values():
-            main, sub = parse_number(a.number)
-            if sub == 0:
-                whole_numbers.add(main)
-
-        if not whole_numbers:
-            return []
+        # Walk the whole numbers in order; anything skipped between neighbours is a gap
+        self._ensure_sorted()
+        gaps = []
+        prev = None
+        for main, sub in self._sorted_keys:
+            if sub != 0:
+                continue
+            if prev is not None and main > prev + 1:
+                gaps.extend(range(prev + 1, main))
+            prev = main
 
-        min_num = min(whole_numbers)
-        max_num = max(whole_numbers)
-
-        expected = set(range(min_num, max_num + 1))
-        missing = sorted(expected - whole_numbers)
-
-        return missing
+        return gaps
 
     def validate_sequence(self) -> tuple[bool, str]:
         """Validate the number sequence.
@@ -361,11 +519,8 @@ class StylePresets:
         }
 
     def get(self, name: str) -> Optional[NumberStyle]:
-        preset = self._presets.get(name)
-        if preset:
-            # Return a copy
-            return NumberStyle(**asdict(preset))
-        return None
+        # Styles are immutable, so the stored instance can be handed out directly
+        return self._presets.get(name)
 
     def save(self, style: NumberStyle) -> None:
         self._presets[style.name] = style
@@ -381,9 +536,9 @@ class StylePresets:
 
     def to_json(self) -> str:
         data = {name: style.to_dict() for name, style in self._presets.items()}
-        return json.dumps(data, indent=2)
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
 
-    def from_json(self, json_str: str) -> None:
-        data = json.loads(json_str)
+    def from_json(self, json_str: Union[str, bytes]) -> None:
+        data = orjson.loads(json_str)
         for name, style_data in data.items():
             self._presets[name] = NumberStyle.from_dict(style_data)
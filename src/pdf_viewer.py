@@ -4,17 +4,20 @@ This version edits the PDF directly - annotations are added to the PDF document
 and rendered as part of the page, ensuring consistency with other PDF readers.
 """
 
-import json
 import logging
+import math
 import fitz
+from collections import OrderedDict
+from contextlib import contextmanager
 from enum import Enum
+from functools import lru_cache
 from PySide6.QtWidgets import (
     QGraphicsView, QGraphicsScene, QGraphicsPixmapItem,
-    QGraphicsRectItem, QApplication
+    QGraphicsRectItem, QGraphicsItem, QApplication
 )
-from PySide6.QtCore import Qt, Signal, QPointF, QRectF
+from PySide6.QtCore import Qt, Signal, QPointF, QRectF, QTimer
 from PySide6.QtGui import (
-    QPixmap, QImage, QPainter, QColor, QFont, QBrush, QPen,
+    QPixmap, QImage, QPainter, QColor, QBrush, QPen,
     QWheelEvent, QMouseEvent, QKeyEvent
 )
 from typing import Optional
@@ -26,8 +29,39 @@ class ToolMode(Enum):
     SELECT = "select"
 
 
-# Metadata key for storing our annotation data in PDF
+# Metadata key for storing our annotation data in PDF (legacy: JSON in /Keywords)
 NAPISY_METADATA_KEY = "NapisyTWON_Annotations"
+_NAPISY_PREFIX = f"{NAPISY_METADATA_KEY}:"
+_NAPISY_PREFIX_LEN = len(_NAPISY_PREFIX)
+
+# Catalog key referencing the compressed stream that holds our annotation data
+NAPISY_DATA_KEY = "NapisyData"
+
+# Number of rendered page pixmaps kept for quick page flips / zoom changes,
+# and their total size limit (high zoom levels make single pages large)
+PAGE_CACHE_SIZE = 8
+PAGE_CACHE_BYTES = 256 * 1024 * 1024
+
+# Cell size (PDF points) of the per-page grid used for annotation hit testing
+HIT_GRID_CELL = 64.0
+
+# Cell size (PDF points) for bucketing FreeText rects when matching xrefs;
+# must be at least the largest position tolerance used in the match
+XREF_MATCH_CELL = 5.0
+
+# get_page_image renders in tiles of this size (device pixels) once a
+# single full-page pixmap would exceed TILED_RENDER_BYTES
+RENDER_TILE_SIZE = 1024
+TILED_RENDER_BYTES = 64 * 1024 * 1024
+
+# Trim MuPDF's resource store (fonts, images, display lists) every this many
+# page rasterizations, so it does not stay at its high-water mark
+STORE_SHRINK_INTERVAL = 16
+STORE_SHRINK_PERCENT = 20
+
+# Deleted annotations stay in the preview's scratch document as unused
+# objects; it is reopened after this many renders to drop them
+PREVIEW_DOC_RENDERS = 200
 
 # Cached font instance for text measurement
 _HELV_FONT = fitz.Font("helv")
@@ -35,27 +69,64 @@ _HELV_FONT = fitz.Font("helv")
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=32)
+def _digit_widths(fontsize: float) -> tuple[float, ...]:
+    """Helvetica advance widths of the digits 0-9 at the given size."""
+    return tuple(_HELV_FONT.text_length(d, fontsize=fontsize) for d in "0123456789")
+
+
+@lru_cache(maxsize=4096)
+def _text_len(text: str, fontsize: float) -> float:
+    """Width of text in Helvetica at the given size (cached, same few strings recur)."""
+    if text.isascii() and text.isdigit():
+        # Most labels are plain numbers: sum digit advances, no MuPDF call
+        widths = _digit_widths(fontsize)
+        return sum(widths[ord(c) - 48] for c in text)
+    return _HELV_FONT.text_length(text, fontsize=fontsize)
+
+
+def _near_rects(buckets: dict, x: float, y: float) -> list:
+    """Bucketed rect tuples whose top-left corner may lie within XREF_MATCH_CELL of (x, y)."""
+    cx, cy = int(x // XREF_MATCH_CELL), int(y // XREF_MATCH_CELL)
+    near = []
+    for bx in (cx - 1, cx, cx + 1):
+        for by in (cy - 1, cy, cy + 1):
+            near.extend(buckets.get((bx, by), ()))
+    return near
+
+
+@lru_cache(maxsize=256)
 def hex_to_rgb(hex_color: str) -> tuple[float, float, float]:
-    """Convert hex color string to (r, g, b) tuple with values 0.0-1.0."""
+    """Convert hex color string to (r, g, b) tuple with values 0.0-1.0.
+
+    Cached: only a handful of style colors are ever converted.
+    """
     hex_color = hex_color.lstrip('#')
     return tuple(int(hex_color[i:i + 2], 16) / 255 for i in (0, 2, 4))
 
 
-def calc_annotation_rect(annotation: NumberAnnotation) -> tuple[fitz.Rect, str, bool, int, float, float]:
-    """Calculate the PDF rect and text metrics for an annotation.
+@lru_cache(maxsize=4096)
+def text_metrics(style: NumberStyle, text: str) -> tuple[str, bool, int, float, float, float, float]:
+    """Text metrics of a number label in a style (cached; styles are immutable).
 
-    Returns (rect, base_text, has_p_suffix, p_fontsize, text_width, text_height).
+    Returns (base_text, has_p_suffix, p_fontsize, base_width, p_width, text_width, text_height).
     """
-    style = annotation.style
-    text = str(annotation.number)
     has_p_suffix = text.endswith('p')
     base_text = text[:-1] if has_p_suffix else text
     p_fontsize = int(style.font_size * 0.5)
 
-    base_width = _HELV_FONT.text_length(base_text, fontsize=style.font_size)
-    p_width = _HELV_FONT.text_length('p', fontsize=p_fontsize) if has_p_suffix else 0
-    text_width = base_width + p_width
-    text_height = style.font_size
+    base_width = _text_len(base_text, style.font_size)
+    p_width = _text_len('p', p_fontsize) if has_p_suffix else 0
+    return base_text, has_p_suffix, p_fontsize, base_width, p_width, base_width + p_width, style.font_size
+
+
+def calc_annotation_rect(annotation: NumberAnnotation) -> tuple[fitz.Rect, str, bool, int, float, float]:
+    """Calculate the PDF rect and text metrics for an annotation.
+
+    Returns (rect, base_text, has_p_suffix, p_fontsize, text_width, text_height).
+    """
+    style = annotation.style
+    base_text, has_p_suffix, p_fontsize, _, _, text_width, text_height = text_metrics(style, annotation.number)
     padding = style.padding
 
     rect = fitz.Rect(
@@ -67,9 +138,40 @@ def calc_annotation_rect(annotation: NumberAnnotation) -> tuple[fitz.Rect, str,
     return rect, base_text, has_p_suffix, p_fontsize, text_width, text_height
 
 
+def annotation_bounds(annotation: NumberAnnotation) -> fitz.Rect:
+    """PDF-space area painted by an annotation: box, 'p' subscript and tail."""
+    style = annotation.style
+    rect, *_ = calc_annotation_rect(annotation)
+    bounds = fitz.Rect(rect)
+    if style.tail_enabled:
+        bounds.include_rect(fitz.Rect(rect.x0, rect.y1, rect.x1, rect.y1 + style.tail_length))
+    # Leave room for border/tail stroke width and anti-aliasing
+    margin = max(style.border_width, style.tail_width) + 2
+    return bounds + (-margin, -margin, margin, margin)
+
+
+def _annot_by_xref(page: fitz.Page, xref: int) -> Optional[fitz.Annot]:
+    """Look up an annotation on a page by xref (None if missing or xref is 0)."""
+    if not xref:
+        return None
+    # load_annot() resolves the xref inside MuPDF instead of walking page.annots();
+    # it raises when the xref is stale or belongs to another page
+    try:
+        return page.load_annot(xref)
+    except Exception:
+        return None
+
+
 class SelectionOverlay(QGraphicsRectItem):
     """Overlay to show selection/hover state on annotations."""
 
+    # Shared drawing tools, allocated once instead of on every paint
+    _SELECTED_PEN = QPen(QColor("#FF0000"), 2)
+    _HOVER_PEN = QPen(QColor("#0078D7"), 1, Qt.PenStyle.DashLine)
+    _NO_BRUSH = QBrush(Qt.BrushStyle.NoBrush)
+    # Half of the widest pen, so strokes aren't clipped by the bounding rect
+    _MARGIN = 1.0
+
     def __init__(self):
         super().__init__()
         self._selected = False
@@ -85,15 +187,19 @@ class SelectionOverlay(QGraphicsRectItem):
         self._hovered = hovered
         self.update()
 
+    def boundingRect(self) -> QRectF:
+        m = self._MARGIN
+        return self.rect().adjusted(-m, -m, m, m)
+
     def paint(self, painter, option, widget):
         if self._selected:
-            painter.setPen(QPen(QColor("#FF0000"), 2))
-            painter.setBrush(QBrush(Qt.BrushStyle.NoBrush))
-            painter.drawRect(self.rect())
+            painter.setPen(self._SELECTED_PEN)
         elif self._hovered:
-            painter.setPen(QPen(QColor("#0078D7"), 1, Qt.PenStyle.DashLine))
-            painter.setBrush(QBrush(Qt.BrushStyle.NoBrush))
-            painter.drawRect(self.rect())
+            painter.setPen(self._HOVER_PEN)
+        else:
+            return
+        painter.setBrush(self._NO_BRUSH)
+        painter.drawRect(self.rect())
 
 
 class PDFPreviewItem(QGraphicsPixmapItem):
@@ -106,20 +212,37 @@ class PDFPreviewItem(QGraphicsPixmapItem):
         self._scale = scale
         self._width = 0
         self._height = 0
+        # Scratch one-page document, only resized/cleared between renders and
+        # reopened every PREVIEW_DOC_RENDERS renders
+        self._doc = None
+        self._page = None
+        self._renders = 0
+        self._open_scratch()
         self.setOpacity(0.7)
         self._render_preview()
 
+    def _open_scratch(self):
+        """(Re)create the scratch document, dropping objects left by earlier renders."""
+        if self._doc is not None:
+            self._doc.close()
+        self._doc = fitz.open()
+        self._page = self._doc.new_page(width=100, height=100)
+        self._renders = 0
+
+    def close(self):
+        """Release the scratch document."""
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+            self._page = None
+
     def _render_preview(self):
         """Render a preview using actual PDF annotation."""
         style = self.style
 
-        # Use a temporary annotation object for calc_annotation_rect
-        tmp = NumberAnnotation(number=str(self.number), style=style)
-        tmp_rect, base_text, has_p_suffix, p_fontsize, text_width, text_height = calc_annotation_rect(tmp)
-
+        base_text, has_p_suffix, p_fontsize, base_width, p_width, text_width, text_height = \
+            text_metrics(style, self.number)
         padding = style.padding
-        base_width = _HELV_FONT.text_length(base_text, fontsize=style.font_size)
-        p_width = _HELV_FONT.text_length('p', fontsize=p_fontsize) if has_p_suffix else 0
 
         width = text_width + padding * 2
         height = text_height + padding * 2
@@ -128,9 +251,19 @@ class PDFPreviewItem(QGraphicsPixmapItem):
         tail_extra = style.tail_length if style.tail_enabled else 0
         page_height = height + 10 + tail_extra
 
-        # Create temporary PDF with annotation
-        doc = fitz.open()
-        page = doc.new_page(width=width + 10, height=page_height)
+        if self._doc is None:
+            return
+        if self._renders >= PREVIEW_DOC_RENDERS:
+            self._open_scratch()
+        self._renders += 1
+
+        # Reuse the scratch page: resize it and remove the previous preview's annotations
+        doc = self._doc
+        page = self._page
+        page.set_mediabox(fitz.Rect(0, 0, width + 10, page_height))
+        annot = page.first_annot
+        while annot:
+            annot = page.delete_annot(annot)
 
         rect = fitz.Rect(5, 5, 5 + width, 5 + height)
 
@@ -204,10 +337,9 @@ class PDFPreviewItem(QGraphicsPixmapItem):
         else:
             fmt = QImage.Format.Format_RGB888
 
-        img = QImage(pix.samples, pix.width, pix.height, pix.stride, fmt)
-        pixmap = QPixmap.fromImage(img.copy())
-
-        doc.close()
+        # fromImage() copies the pixels while pix is still alive, no extra copy needed
+        img = QImage(pix.samples_mv, pix.width, pix.height, pix.stride, fmt)
+        pixmap = QPixmap.fromImage(img)
 
         self.setPixmap(pixmap)
         self._width = pixmap.width()
@@ -222,6 +354,8 @@ class PDFPreviewItem(QGraphicsPixmapItem):
         self._render_preview()
 
     def set_scale(self, scale: float):
+        if scale == self._scale:
+            return
         self._scale = scale
         self._render_preview()
 
@@ -243,6 +377,9 @@ class PDFViewer(QGraphicsView):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._scene = QGraphicsScene(self)
+        # The scene only ever holds a handful of items (page, overlay, preview);
+        # a BSP index would just add bookkeeping to every move
+        self._scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
         self.setScene(self._scene)
 
         # PDF state
@@ -250,6 +387,59 @@ class PDFViewer(QGraphicsView):
         self._current_page = 0
         self._page_pixmap: Optional[QGraphicsPixmapItem] = None
 
+        # Rendered page pixmaps, LRU keyed by (page, zoom, page revision);
+        # a page's revision is bumped whenever its PDF annotations change
+        self._page_cache: OrderedDict[tuple[int, float, int], QPixmap] = OrderedDict()
+        self._page_revs: dict[int, int] = {}
+        self._page_rects: dict[int, fitz.Rect] = {}
+        # Cache key of the render currently shown, to skip identical re-renders
+        self._last_render_key: Optional[tuple[int, float, int]] = None
+        # Page rasterizations since MuPDF's store was last trimmed
+        self._renders_since_shrink = 0
+        # Area of the current page (PDF coords) changed since it was last rendered
+        self._dirty_rect: Optional[fitz.Rect] = None
+        # Per-page hit-test grid: (cell_x, cell_y) -> [(x0, y0, x1, y1, annotation)],
+        # rebuilt lazily and dropped together with the page's cached renders
+        self._hit_grids: dict[int, dict[tuple[int, int], list[tuple]]] = {}
+
+        # Neighbouring pages are pre-rendered into the cache when idle. MuPDF is
+        # not thread-safe, so this runs on the GUI thread one page per timer tick.
+        self._prefetch_pages: list[int] = []
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(150)
+        self._prefetch_timer.timeout.connect(self._prefetch_next)
+
+        # During rapid zooming pages are shown at half resolution; the full
+        # render happens once zooming pauses
+        self._lowres_shown = False
+        # Zoom the page pixmap on screen was rasterized at
+        self._raster_zoom = 1.0
+        self._zoom_idle_timer = QTimer(self)
+        self._zoom_idle_timer.setSingleShot(True)
+        self._zoom_idle_timer.setInterval(120)
+        self._zoom_idle_timer.timeout.connect(self._on_zoom_idle)
+
+        # Nesting depth of bulk_update() blocks; renders requested inside are
+        # folded into a single full render when the outermost block exits
+        self._bulk_depth = 0
+        self._bulk_render_pending = False
+
+        # Window resizes in fit mode are debounced into one re-render
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(80)
+        self._resize_timer.timeout.connect(self._on_resize_idle)
+
+        # Insert-preview moves are coalesced: only the latest cursor position
+        # (viewport coords) is mapped to the scene and applied, once per
+        # event-loop pass
+        self._pending_preview_pos: Optional[QPointF] = None
+        self._preview_pos_timer = QTimer(self)
+        self._preview_pos_timer.setSingleShot(True)
+        self._preview_pos_timer.setInterval(0)
+        self._preview_pos_timer.timeout.connect(self._apply_preview_pos)
+
         # View state
         self._zoom = 1.0
         self._min_zoom = 0.1
@@ -290,12 +480,14 @@ class PDFViewer(QGraphicsView):
         try:
             self._doc = fitz.open(path)
             self._current_page = 0
+            self._page_rects.clear()
+            self._invalidate_page_cache()
             self._annotations.clear()
             self._selected_annotation = None
 
             # Try to load our annotation metadata from PDF
             if self.load_metadata_from_pdf():
-                logger.info("Loaded %d annotations from PDF metadata", len(self._annotations.all()))
+                logger.info("Loaded %d annotations from PDF metadata", self._annotations.count())
 
             self._render_page()
             return True
@@ -312,11 +504,13 @@ class PDFViewer(QGraphicsView):
 
             # Reopen
             self._doc = fitz.open(path)
+            self._page_rects.clear()
+            self._invalidate_page_cache()
             self._selected_annotation = None
 
             # Load annotations from metadata (will sync xrefs)
             if self.load_metadata_from_pdf():
-                logger.info("Reloaded %d annotations after save", len(self._annotations.all()))
+                logger.info("Reloaded %d annotations after save", self._annotations.count())
 
             self._render_page()
             return True
@@ -332,6 +526,16 @@ class PDFViewer(QGraphicsView):
         if self._doc:
             self._doc.close()
             self._doc = None
+            # Nothing cached by MuPDF is of use for the next document
+            fitz.TOOLS.store_shrink(100)
+        self._page_rects.clear()
+        self._invalidate_page_cache()
+        self._prefetch_timer.stop()
+        self._prefetch_pages = []
+        self._preview_pos_timer.stop()
+        self._pending_preview_pos = None
+        if self._preview_item is not None:
+            self._preview_item.close()
         self._scene.clear()
         self._page_pixmap = None
         self._preview_item = None
@@ -362,49 +566,142 @@ class PDFViewer(QGraphicsView):
         if self._current_page > 0:
             self.go_to_page(self._current_page - 1)
 
+    def _page_cache_key(self, page: Optional[int] = None, zoom: Optional[float] = None) -> tuple[int, float, int]:
+        if page is None:
+            page = self._current_page
+        if zoom is None:
+            zoom = self._zoom
+        return (page, round(zoom, 3), self._page_revs.get(page, 0))
+
+    def _page_rect(self, page_num: int) -> fitz.Rect:
+        """Page size, cached per page since it never changes while the document is open."""
+        rect = self._page_rects.get(page_num)
+        if rect is None:
+            rect = self._page_rects[page_num] = self._doc.load_page(page_num).rect
+        return rect
+
+    def _fit_zoom(self, page_rect: fitz.Rect) -> float:
+        """Zoom that fits a page of the given size into the viewport."""
+        view_rect = self.viewport().rect()
+        zoom_x = view_rect.width() / page_rect.width
+        zoom_y = view_rect.height() / page_rect.height
+        # Quantized so small resizes map to the same zoom (and the same render)
+        return round(min(zoom_x, zoom_y) * 0.95, 2)
+
+    def _rasterize_page(self, page: fitz.Page, zoom: float) -> QPixmap:
+        """Render a page WITH annotations to a QPixmap."""
+        mat = fitz.Matrix(zoom, zoom)
+        pix = page.get_pixmap(matrix=mat)
+
+        self._renders_since_shrink += 1
+        if self._renders_since_shrink >= STORE_SHRINK_INTERVAL:
+            self._renders_since_shrink = 0
+            fitz.TOOLS.store_shrink(STORE_SHRINK_PERCENT)
+
+        # Convert to QImage
+        if pix.alpha:
+            fmt = QImage.Format.Format_RGBA8888
+        else:
+            fmt = QImage.Format.Format_RGB888
+
+        # Wrap the pixmap's buffer without copying; fromImage() makes the only copy
+        img = QImage(pix.samples_mv, pix.width, pix.height, pix.stride, fmt)
+        return QPixmap.fromImage(img)
+
+    def _schedule_prefetch(self):
+        """Queue rendering of the neighbouring pages once the UI is idle."""
+        self._prefetch_pages = [
+            p for p in (self._current_page + 1, self._current_page - 1)
+            if 0 <= p < self._doc.page_count
+        ]
+        self._prefetch_timer.start()
+
+    def _prefetch_next(self):
+        """Render one queued neighbour page into the page cache, then yield to the event loop."""
+        if not self._doc or not self._prefetch_pages:
+            return
+        page_num = self._prefetch_pages.pop(0)
+        zoom = self._fit_zoom(self._page_rect(page_num)) if self._fit_mode else self._zoom
+        key = self._page_cache_key(page_num, zoom)
+        if key not in self._page_cache:
+            page = self._doc.load_page(page_num)
+            self._cache_page_pixmap(key, self._rasterize_page(page, zoom))
+            # Keep the current page the most recently used entry
+            current_key = self._page_cache_key()
+            if current_key in self._page_cache:
+                self._page_cache.move_to_end(current_key)
+        if self._prefetch_pages:
+            self._prefetch_timer.start()
+
+    def _cache_page_pixmap(self, key: tuple[int, float, int], pixmap: QPixmap):
+        self._page_cache[key] = pixmap
+        self._page_cache.move_to_end(key)
+        while len(self._page_cache) > PAGE_CACHE_SIZE:
+            self._page_cache.popitem(last=False)
+        # Always keep the newest entry, even if it alone exceeds the limit
+        while (len(self._page_cache) > 1 and
+               sum(p.width() * p.height() * p.depth() // 8 for p in self._page_cache.values()) > PAGE_CACHE_BYTES):
+            self._page_cache.popitem(last=False)
+
+    def _invalidate_page_cache(self, page_num: Optional[int] = None):
+        """Forget rendered pixmaps of one page (after its annotations changed) or of all pages."""
+        if page_num is None:
+            self._page_cache.clear()
+            self._page_revs.clear()
+            self._hit_grids.clear()
+            self._last_render_key = None
+            self._dirty_rect = None
+            return
+        self._page_revs[page_num] = self._page_revs.get(page_num, 0) + 1
+        self._hit_grids.pop(page_num, None)
+        for key in [k for k in self._page_cache if k[0] == page_num]:
+            del self._page_cache[key]
+
+    def _mark_dirty(self, page_num: int, rect: fitz.Rect):
+        """Record a changed area so the next refresh re-renders only that part."""
+        if page_num != self._current_page:
+            return
+        rect = fitz.Rect(rect) + (-2, -2, 2, 2)
+        self._dirty_rect = rect if self._dirty_rect is None else self._dirty_rect | rect
+
     def _render_page(self):
         """Render the current page from PDF (includes annotations)."""
         if not self._doc:
             return
 
-        page = self._doc.load_page(self._current_page)
-
         # Calculate zoom to fit if needed
         if self._fit_mode:
-            view_rect = self.viewport().rect()
-            page_rect = page.rect
-            zoom_x = view_rect.width() / page_rect.width
-            zoom_y = view_rect.height() / page_rect.height
-            self._zoom = min(zoom_x, zoom_y) * 0.95
+            self._zoom = self._fit_zoom(self._page_rect(self._current_page))
 
-        # Render page WITH annotations
-        mat = fitz.Matrix(self._zoom, self._zoom)
-        pix = page.get_pixmap(matrix=mat)
+        key = self._page_cache_key()
+        if key == self._last_render_key and not self._lowres_shown and self._page_pixmap is not None:
+            # Same page, zoom and annotations as what is on screen
+            return
 
-        # Convert to QImage
-        if pix.alpha:
-            fmt = QImage.Format.Format_RGBA8888
+        pixmap = self._page_cache.get(key)
+        if pixmap is not None:
+            self._page_cache.move_to_end(key)
         else:
-            fmt = QImage.Format.Format_RGB888
-
-        img = QImage(pix.samples, pix.width, pix.height, pix.stride, fmt).copy()
-        pixmap = QPixmap.fromImage(img)
-
-        # Update scene
-        self._scene.clear()
-        self._preview_item = None
-        self._selection_overlay = None
-        self._page_pixmap = self._scene.addPixmap(pixmap)
+            page = self._doc.load_page(self._current_page)
+            pixmap = self._rasterize_page(page, self._zoom)
+            self._cache_page_pixmap(key, pixmap)
+
+        self._lowres_shown = False
+        self._raster_zoom = self._zoom
+        self._last_render_key = key
+        self._dirty_rect = None
+
+        # Update scene: swap the pixmap of the persistent page item
+        self._ensure_scene_items()
+        self._page_pixmap.setPixmap(pixmap)
+        self._page_pixmap.setScale(1.0)
         self._scene.setSceneRect(0, 0, pixmap.width(), pixmap.height())
 
-        # Create selection overlay
-        self._selection_overlay = SelectionOverlay()
-        self._selection_overlay.setVisible(False)
-        self._scene.addItem(self._selection_overlay)
-
         # Update selection overlay if we have a selected annotation
         if self._selected_annotation:
             self._update_selection_overlay(self._selected_annotation)
+        else:
+            self._selection_overlay.setVisible(False)
 
         # Re-create preview if in insert mode
         if self._tool_mode == ToolMode.INSERT:
@@ -412,6 +709,61 @@ class PDFViewer(QGraphicsView):
 
         self.zoom_changed.emit(self._zoom)
 
+        # Likely next pages, rendered ahead of time
+        self._schedule_prefetch()
+
+    def _ensure_scene_items(self):
+        """Create the page pixmap item and selection overlay once; later renders reuse them."""
+        if self._page_pixmap is None:
+            self._page_pixmap = self._scene.addPixmap(QPixmap())
+            self._page_pixmap.setZValue(0)
+            # Scrolling/panning then only blits the cached device-space image
+            self._page_pixmap.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+        if self._selection_overlay is None:
+            self._selection_overlay = SelectionOverlay()
+            self._selection_overlay.setVisible(False)
+            self._selection_overlay.setZValue(1)
+            self._selection_overlay.setCacheMode(QGraphicsItem.CacheMode.ItemCoordinateCache)
+            self._scene.addItem(self._selection_overlay)
+
+    def _render_page_region(self, rect: fitz.Rect):
+        """Re-rasterize only part of the current page (PDF coords) onto the page pixmap.
+
+        Used after small edits (move/insert/delete) instead of a full _render_page().
+        """
+        if not self._doc or self._page_pixmap is None:
+            return
+        if self._lowres_shown:
+            # The shown pixmap is a scaled-down stand-in, re-render it properly
+            self._render_page()
+            return
+
+        page = self._doc.load_page(self._current_page)
+        clip = fitz.Rect(rect) & page.rect
+        if clip.is_empty:
+            return
+
+        mat = fitz.Matrix(self._zoom, self._zoom)
+        pix = page.get_pixmap(matrix=mat, clip=clip)
+
+        if pix.alpha:
+            fmt = QImage.Format.Format_RGBA8888
+        else:
+            fmt = QImage.Format.Format_RGB888
+
+        img = QImage(pix.samples_mv, pix.width, pix.height, pix.stride, fmt)
+
+        # Blit the patch at its device position (pix.x/pix.y) onto the page pixmap
+        pixmap = self._page_pixmap.pixmap()
+        painter = QPainter(pixmap)
+        painter.drawImage(pix.x, pix.y, img)
+        painter.end()
+        self._page_pixmap.setPixmap(pixmap)
+        # The patched pixmap is the up-to-date render of this page revision
+        self._dirty_rect = None
+        self._last_render_key = self._page_cache_key()
+        self._cache_page_pixmap(self._last_render_key, pixmap)
+
     def _update_selection_overlay(self, annotation: NumberAnnotation):
         """Update the selection overlay to match an annotation's position."""
         if not self._selection_overlay:
@@ -430,12 +782,15 @@ class PDFViewer(QGraphicsView):
         self._selection_overlay.setVisible(True)
 
     def _create_preview(self):
-        """Create or update the preview item."""
-        if self._preview_item:
-            self._scene.removeItem(self._preview_item)
-        self._preview_item = PDFPreviewItem(self._current_style, self._next_number, self._zoom)
+        """Create the preview item, or reuse the existing one at the current zoom."""
+        if self._preview_item is None:
+            self._preview_item = PDFPreviewItem(self._current_style, self._next_number, self._zoom)
+        else:
+            self._preview_item.set_scale(self._zoom)
         self._preview_item.setVisible(False)
-        self._scene.addItem(self._preview_item)
+        if self._preview_item.scene() is None:
+            self._preview_item.setZValue(2)
+            self._scene.addItem(self._preview_item)
 
     def set_style(self, style: NumberStyle):
         """Set the current style for new annotations."""
@@ -464,31 +819,39 @@ class PDFViewer(QGraphicsView):
         if not self._doc:
             return
 
-        # Remove all existing FreeText and Line annotations
+        self._invalidate_page_cache()
+
+        # One pass per page: load it once, remove all existing FreeText and
+        # Line annotations, then add the store's annotations for that page
         for page_num in range(self._doc.page_count):
             page = self._doc.load_page(page_num)
-            annots_to_delete = []
-            for annot in page.annots():
-                if annot.type[0] in (fitz.PDF_ANNOT_FREE_TEXT, fitz.PDF_ANNOT_LINE):
-                    annots_to_delete.append(annot)
+            annots_to_delete = [
+                annot for annot in page.annots()
+                if annot.type[0] in (fitz.PDF_ANNOT_FREE_TEXT, fitz.PDF_ANNOT_LINE)
+            ]
             for annot in annots_to_delete:
                 page.delete_annot(annot)
 
-        # Add all annotations from store
-        for annotation in self._annotations.all():
-            self._add_pdf_annotation(annotation)
+            for annotation in self._annotations.get_for_page(page_num):
+                self._add_pdf_annotation(annotation, page)
+
+    def _add_pdf_annotation(self, annotation: NumberAnnotation, page: Optional[fitz.Page] = None) -> int:
+        """Add an annotation to the PDF and return its xref.
 
-    def _add_pdf_annotation(self, annotation: NumberAnnotation) -> int:
-        """Add an annotation to the PDF and return its xref."""
+        Pass the already loaded page when adding many annotations to it.
+        """
         if not self._doc:
             return 0
 
-        page = self._doc.load_page(annotation.page)
+        if page is None:
+            page = self._doc.load_page(annotation.page)
+        self._invalidate_page_cache(annotation.page)
+        self._mark_dirty(annotation.page, annotation_bounds(annotation))
         style = annotation.style
-        rect, base_text, has_p_suffix, p_fontsize, text_width, text_height = calc_annotation_rect(annotation)
+        rect, *_ = calc_annotation_rect(annotation)
+        base_text, has_p_suffix, p_fontsize, base_width, p_width, text_width, text_height = \
+            text_metrics(style, annotation.number)
         padding = style.padding
-        base_width = _HELV_FONT.text_length(base_text, fontsize=style.font_size)
-        p_width = _HELV_FONT.text_length('p', fontsize=p_fontsize) if has_p_suffix else 0
 
         fg_rgb = hex_to_rgb(style.text_color)
         bg_rgb = hex_to_rgb(style.bg_color) if style.bg_opacity > 0 else None
@@ -511,7 +874,7 @@ class PDFViewer(QGraphicsView):
 
         annot_xref = annot.xref
 
-        # Set annotation name (/NM) to our UUID for identification
+        # Set annotation name (/Name) to our UUID for identification
         annot.set_name(annotation.id)
 
         # Explicitly set /Q (quadding) for alignment
@@ -575,17 +938,12 @@ class PDFViewer(QGraphicsView):
             return
 
         page = self._doc.load_page(annotation.page)
+        self._invalidate_page_cache(annotation.page)
 
         expected_rect, *_ = calc_annotation_rect(annotation)
 
-        annot_to_delete = None
-
         # Try to find by xref first
-        if annotation.pdf_annot_xref != 0:
-            for annot in page.annots():
-                if annot.xref == annotation.pdf_annot_xref:
-                    annot_to_delete = annot
-                    break
+        annot_to_delete = _annot_by_xref(page, annotation.pdf_annot_xref)
 
         # If not found by xref, try to find by position (within tolerance)
         if annot_to_delete is None:
@@ -601,22 +959,23 @@ class PDFViewer(QGraphicsView):
                         break
 
         if annot_to_delete:
+            self._mark_dirty(annotation.page, annot_to_delete.rect)
             page.delete_annot(annot_to_delete)
 
         # Also delete 'p' subscript annotation if exists
         if annotation.pdf_p_xref != 0:
-            for annot in page.annots():
-                if annot.xref == annotation.pdf_p_xref:
-                    page.delete_annot(annot)
-                    break
+            p_annot = _annot_by_xref(page, annotation.pdf_p_xref)
+            if p_annot:
+                self._mark_dirty(annotation.page, p_annot.rect)
+                page.delete_annot(p_annot)
             annotation.pdf_p_xref = 0
 
         # Also delete tail annotation if exists
         if annotation.pdf_tail_xref != 0:
-            for annot in page.annots():
-                if annot.xref == annotation.pdf_tail_xref:
-                    page.delete_annot(annot)
-                    break
+            tail_annot = _annot_by_xref(page, annotation.pdf_tail_xref)
+            if tail_annot:
+                self._mark_dirty(annotation.page, tail_annot.rect)
+                page.delete_annot(tail_annot)
             annotation.pdf_tail_xref = 0
 
     def _move_pdf_annotation(self, annotation: NumberAnnotation, old_x: float, old_y: float):
@@ -625,27 +984,26 @@ class PDFViewer(QGraphicsView):
             return False
 
         page = self._doc.load_page(annotation.page)
+        self._invalidate_page_cache(annotation.page)
 
         style = annotation.style
-        new_rect, base_text, has_p_suffix, p_fontsize, text_width, text_height = calc_annotation_rect(annotation)
+        new_rect, *_ = calc_annotation_rect(annotation)
+        base_text, has_p_suffix, p_fontsize, base_width, p_width, text_width, text_height = \
+            text_metrics(style, annotation.number)
         padding = style.padding
-        base_width = _HELV_FONT.text_length(base_text, fontsize=style.font_size)
-        p_width = _HELV_FONT.text_length('p', fontsize=p_fontsize) if has_p_suffix else 0
 
         width = new_rect.width
         height = new_rect.height
 
         old_rect = fitz.Rect(old_x, old_y, old_x + width, old_y + height)
 
-        # Find the annotation
-        annot_to_move = None
+        new_bounds = annotation_bounds(annotation)
+        dx, dy = old_x - annotation.x, old_y - annotation.y
+        self._mark_dirty(annotation.page, new_bounds)
+        self._mark_dirty(annotation.page, new_bounds + (dx, dy, dx, dy))
 
-        # Try by xref first
-        if annotation.pdf_annot_xref != 0:
-            for annot in page.annots():
-                if annot.xref == annotation.pdf_annot_xref:
-                    annot_to_move = annot
-                    break
+        # Find the annotation, by xref first
+        annot_to_move = _annot_by_xref(page, annotation.pdf_annot_xref)
 
         # Fallback to position matching
         if annot_to_move is None:
@@ -666,10 +1024,9 @@ class PDFViewer(QGraphicsView):
             # Also move 'p' subscript annotation if exists - delete and recreate
             if has_p_suffix and annotation.pdf_p_xref != 0:
                 # Delete old 'p' annotation
-                for annot in page.annots():
-                    if annot.xref == annotation.pdf_p_xref:
-                        page.delete_annot(annot)
-                        break
+                old_p_annot = _annot_by_xref(page, annotation.pdf_p_xref)
+                if old_p_annot:
+                    page.delete_annot(old_p_annot)
 
                 fg_rgb = hex_to_rgb(style.text_color)
 
@@ -700,14 +1057,8 @@ class PDFViewer(QGraphicsView):
                 old_tail_start_y = old_rect.y1
                 old_tail_end_y = old_tail_start_y + style.tail_length
 
-                # Find and delete old tail
-                tail_to_delete = None
-                # Try by xref first
-                if annotation.pdf_tail_xref != 0:
-                    for annot in page.annots():
-                        if annot.xref == annotation.pdf_tail_xref:
-                            tail_to_delete = annot
-                            break
+                # Find and delete old tail, by xref first
+                tail_to_delete = _annot_by_xref(page, annotation.pdf_tail_xref)
 
                 # Fallback to position matching
                 if tail_to_delete is None:
@@ -774,9 +1125,74 @@ class PDFViewer(QGraphicsView):
         self.set_zoom(1.0)
 
     def set_zoom(self, zoom: float):
-        self._zoom = max(self._min_zoom, min(self._max_zoom, zoom))
+        # Snap to the page cache's key grid, so repeated zoom in/out steps land
+        # on exactly the zoom a cached pixmap was rendered at
+        self._zoom = round(max(self._min_zoom, min(self._max_zoom, zoom)), 3)
         self._fit_mode = False
-        self._render_page()
+        if self._page_cache_key() in self._page_cache:
+            self._render_page()
+        elif self._zoom_transform_only():
+            # Shown page rescaled; re-rasterized once zooming pauses
+            pass
+        elif self._zoom_idle_timer.isActive():
+            # A zoom step right after another one is part of a continuous zoom:
+            # show a cheap half-resolution render
+            self._render_page_lowres()
+        else:
+            self._render_page()
+        self._zoom_idle_timer.start()
+
+    def _on_zoom_idle(self):
+        if self._lowres_shown:
+            self._render_page()
+
+    def _zoom_transform_only(self) -> bool:
+        """Rescale the shown page pixmap to the current zoom without rasterizing.
+
+        Only done within half an octave of the raster's own zoom, beyond that
+        the scaled-up page gets too blurry. Returns False if not applicable.
+        """
+        shown = self._last_render_key
+        if (self._page_pixmap is None or shown is None or shown[0] != self._current_page
+                or abs(math.log2(self._zoom / self._raster_zoom)) > 0.5):
+            return False
+
+        scale = self._zoom / self._raster_zoom
+        pixmap = self._page_pixmap.pixmap()
+        self._page_pixmap.setTransformationMode(Qt.TransformationMode.SmoothTransformation)
+        self._page_pixmap.setScale(scale)
+        self._scene.setSceneRect(0, 0, pixmap.width() * scale, pixmap.height() * scale)
+        self._lowres_shown = True
+
+        if self._selected_annotation:
+            self._update_selection_overlay(self._selected_annotation)
+        if self._preview_item:
+            self._preview_item.setVisible(False)
+
+        self.zoom_changed.emit(self._zoom)
+        return True
+
+    def _render_page_lowres(self):
+        """Show the current page at half resolution, scaled up to the current zoom."""
+        if not self._doc or self._page_pixmap is None:
+            self._render_page()
+            return
+
+        page = self._doc.load_page(self._current_page)
+        self._raster_zoom = self._zoom * 0.5
+        pixmap = self._rasterize_page(page, self._raster_zoom)
+        self._page_pixmap.setPixmap(pixmap)
+        self._page_pixmap.setTransformationMode(Qt.TransformationMode.SmoothTransformation)
+        self._page_pixmap.setScale(2.0)
+        self._scene.setSceneRect(0, 0, pixmap.width() * 2, pixmap.height() * 2)
+        self._lowres_shown = True
+
+        if self._selected_annotation:
+            self._update_selection_overlay(self._selected_annotation)
+        if self._preview_item:
+            self._preview_item.setVisible(False)
+
+        self.zoom_changed.emit(self._zoom)
 
     def get_zoom(self) -> float:
         return self._zoom
@@ -819,8 +1235,7 @@ class PDFViewer(QGraphicsView):
 
             # Insert new annotation only in INSERT mode
             if self._tool_mode == ToolMode.INSERT and self._page_pixmap:
-                page_rect = self._page_pixmap.boundingRect()
-                if page_rect.contains(scene_pos):
+                if self._scene.sceneRect().contains(scene_pos):
                     self._insert_annotation(scene_pos)
                     event.accept()
                     return
@@ -867,29 +1282,42 @@ class PDFViewer(QGraphicsView):
             new_x = self._drag_annotation_start.x() + pdf_delta_x
             new_y = self._drag_annotation_start.y() + pdf_delta_y
 
-            # Update annotation position (visual feedback via selection overlay)
+            # Update annotation position (visual feedback via selection overlay).
+            # The overlay was sized on press; a drag only translates it.
             self._dragging_annotation.x = new_x
             self._dragging_annotation.y = new_y
-            self._update_selection_overlay(self._dragging_annotation)
+            if self._selection_overlay:
+                self._selection_overlay.setPos(new_x * self._zoom, new_y * self._zoom)
             event.accept()
             return
 
         # Update preview position
+        # (close_document() drops _preview_item together with the scene items)
         if self._tool_mode == ToolMode.INSERT and self._preview_item is not None:
-            try:
-                scene_pos = self.mapToScene(event.position().toPoint())
-                if self._page_pixmap and self._page_pixmap.boundingRect().contains(scene_pos):
-                    self._preview_item.setPos(scene_pos)
-                    self._preview_item.setVisible(True)
-                    self.setCursor(Qt.CursorShape.CrossCursor)
-                else:
-                    self._preview_item.setVisible(False)
-                    self.setCursor(Qt.CursorShape.ArrowCursor)
-            except RuntimeError:
-                self._preview_item = None
+            self._pending_preview_pos = event.position()
+            if not self._preview_pos_timer.isActive():
+                self._preview_pos_timer.start()
 
         super().mouseMoveEvent(event)
 
+    def _apply_preview_pos(self):
+        """Move the insert preview to the last cursor position seen."""
+        view_pos = self._pending_preview_pos
+        self._pending_preview_pos = None
+        if view_pos is None or self._preview_item is None or self._tool_mode != ToolMode.INSERT:
+            return
+        # Mapped with the current view transform, so a scroll in between is accounted for
+        scene_pos = self.mapToScene(view_pos.toPoint())
+        # The scene rect is the page at the current zoom, also while a
+        # rescaled stand-in pixmap is shown
+        if self._scene.sceneRect().contains(scene_pos):
+            self._preview_item.setPos(scene_pos)
+            self._preview_item.setVisible(True)
+            self.setCursor(Qt.CursorShape.CrossCursor)
+        else:
+            self._preview_item.setVisible(False)
+            self.setCursor(Qt.CursorShape.ArrowCursor)
+
     def mouseReleaseEvent(self, event: QMouseEvent):
         if event.button() == Qt.MouseButton.MiddleButton and self._panning:
             self._panning = False
@@ -909,8 +1337,9 @@ class PDFViewer(QGraphicsView):
                     self._delete_pdf_annotation(ann)
                     self._add_pdf_annotation(ann)
                 self._annotations.modified = True
-                self._render_page()
-                self._select_annotation(ann)  # Re-select after re-render
+                # Only the old and new areas changed on the page
+                self._request_render()
+                self._select_annotation(ann)
                 self.annotation_moved.emit(ann, old_x, old_y)
 
             self._dragging_annotation = None
@@ -936,19 +1365,38 @@ class PDFViewer(QGraphicsView):
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
+        # Most resize steps leave the (rounded) fit zoom unchanged: nothing to redo
+        if (self._fit_mode and self._doc
+                and self._fit_zoom(self._page_rect(self._current_page)) != self._zoom):
+            self._resize_timer.start()
+
+    def _on_resize_idle(self):
         if self._fit_mode and self._doc:
             self._render_page()
 
+    def _hit_grid(self, page_num: int) -> dict[tuple[int, int], list[tuple]]:
+        """Uniform grid of annotation rects on a page, built on first use."""
+        grid = self._hit_grids.get(page_num)
+        if grid is None:
+            grid = {}
+            for annotation in self._annotations.get_for_page(page_num):
+                rect, *_ = calc_annotation_rect(annotation)
+                entry = (rect.x0, rect.y0, rect.x1, rect.y1, annotation)
+                # Register in every cell the rect overlaps
+                for cx in range(int(rect.x0 // HIT_GRID_CELL), int(rect.x1 // HIT_GRID_CELL) + 1):
+                    for cy in range(int(rect.y0 // HIT_GRID_CELL), int(rect.y1 // HIT_GRID_CELL) + 1):
+                        grid.setdefault((cx, cy), []).append(entry)
+            self._hit_grids[page_num] = grid
+        return grid
+
     def _find_annotation_at(self, scene_pos: QPointF) -> Optional[NumberAnnotation]:
         """Find annotation at the given scene position."""
         pdf_x = scene_pos.x() / self._zoom
         pdf_y = scene_pos.y() / self._zoom
 
-        for annotation in self._annotations.get_for_page(self._current_page):
-            ann_rect, *_ = calc_annotation_rect(annotation)
-            rect = QRectF(ann_rect.x0, ann_rect.y0, ann_rect.width, ann_rect.height)
-
-            if rect.contains(pdf_x, pdf_y):
+        cell = (int(pdf_x // HIT_GRID_CELL), int(pdf_y // HIT_GRID_CELL))
+        for x0, y0, x1, y1, annotation in self._hit_grid(self._current_page).get(cell, ()):
+            if x0 <= pdf_x <= x1 and y0 <= pdf_y <= y1:
                 return annotation
 
         return None
@@ -971,11 +1419,10 @@ class PDFViewer(QGraphicsView):
         pdf_x = scene_pos.x() / self._zoom
         pdf_y = scene_pos.y() / self._zoom
 
-        # Center on click
-        font = fitz.Font("helv")
-        text_width = font.text_length(str(self._next_number), fontsize=self._current_style.font_size)
-        text_height = self._current_style.font_size
-        padding = self._current_style.padding
+        # Center on click, using the same cached metrics as the final rect
+        style = self._current_style
+        *_, text_width, text_height = text_metrics(style, self._next_number)
+        padding = style.padding
 
         width = text_width + padding * 2
         height = text_height + padding * 2
@@ -997,28 +1444,16 @@ class PDFViewer(QGraphicsView):
             x=pdf_x,
             y=pdf_y,
             number=number,
-            style=NumberStyle(**{
-                'name': self._current_style.name,
-                'font_family': self._current_style.font_family,
-                'font_size': self._current_style.font_size,
-                'text_color': self._current_style.text_color,
-                'bg_color': self._current_style.bg_color,
-                'bg_opacity': self._current_style.bg_opacity,
-                'padding': self._current_style.padding,
-                'border_enabled': self._current_style.border_enabled,
-                'border_width': self._current_style.border_width,
-                'tail_enabled': self._current_style.tail_enabled,
-                'tail_length': self._current_style.tail_length,
-                'tail_width': self._current_style.tail_width,
-            })
+            style=self._current_style,  # Immutable, shared with the toolbar style
         )
 
         # Add to PDF and store
         self._add_pdf_annotation(annotation)
         self._annotations.add(annotation)
 
-        # Re-render to show the annotation
-        self._render_page()
+        # Re-render just the annotation's area to show it
+        if annotation.page == self._current_page:
+            self._request_render()
 
         # Auto-increment
         main, sub = parse_number(number)
@@ -1050,7 +1485,9 @@ class PDFViewer(QGraphicsView):
         self._annotations.remove(annotation.id)
 
         self._selected_annotation = None
-        self._render_page()
+        if self._selection_overlay:
+            self._selection_overlay.setVisible(False)
+        self._request_render()
 
         self.annotation_deleted.emit(annotation)
         self.annotation_selected.emit(None)
@@ -1064,13 +1501,13 @@ class PDFViewer(QGraphicsView):
             self._selected_annotation = None
             self.annotation_selected.emit(None)
 
-        self._render_page()
+        self._request_render()
 
     def add_annotation(self, annotation: NumberAnnotation):
         """Add an annotation (for undo/redo)."""
         self._add_pdf_annotation(annotation)
         self._annotations.add(annotation)
-        self._render_page()
+        self._request_render()
 
     def update_pdf_annotation(self, annotation: NumberAnnotation):
         """Delete and re-create a PDF annotation (public API for style/number changes)."""
@@ -1084,7 +1521,38 @@ class PDFViewer(QGraphicsView):
 
     def refresh_page(self):
         """Refresh the current page display."""
-        self._render_page()
+        self._request_render()
+
+    @contextmanager
+    def bulk_update(self):
+        """Defer page re-renders while making many annotation changes.
+
+        The page is rendered once when the outermost block exits.
+        """
+        self._bulk_depth += 1
+        try:
+            yield
+        finally:
+            self._bulk_depth -= 1
+            if self._bulk_depth == 0 and self._bulk_render_pending:
+                self._bulk_render_pending = False
+                self._request_render()
+
+    def _request_render(self):
+        """Bring the page display up to date, unless inside bulk_update().
+
+        When the only changes are annotation edits on the shown page at the
+        shown zoom, only their dirty rect is re-rendered.
+        """
+        if self._bulk_depth:
+            self._bulk_render_pending = True
+            return
+        shown = self._last_render_key
+        if (self._dirty_rect is not None and shown is not None and self._page_pixmap is not None
+                and shown[:2] == self._page_cache_key()[:2]):
+            self._render_page_region(self._dirty_rect)
+        else:
+            self._render_page()
 
     def select_annotation(self, annotation: NumberAnnotation):
         """Select a specific annotation by its data."""
@@ -1096,94 +1564,210 @@ class PDFViewer(QGraphicsView):
         y = annotation.y * self._zoom
         self.centerOn(x, y)
 
-    def get_page_image(self, page: int, scale: float = 2.0) -> Optional[QImage]:
-        """Get a page as QImage (rendered from PDF with annotations)."""
+    def get_page_image(self, page: int, scale: float = 2.0, grayscale: bool = False) -> Optional[QImage]:
+        """Get a page as QImage (rendered from PDF with annotations).
+
+        grayscale=True renders 8-bit gray, a third of the RGB size, for
+        previews where colour does not matter.
+        """
         if not self._doc or page < 0 or page >= self._doc.page_count:
             return None
 
+        if not grayscale:
+            # Reuse the viewer's render of this page if it was made at this scale
+            cached = self._page_cache.get(self._page_cache_key(page, scale))
+            if cached is not None:
+                return cached.toImage()
+
         pdf_page = self._doc.load_page(page)
         mat = fitz.Matrix(scale, scale)
-        pix = pdf_page.get_pixmap(matrix=mat)
+        irect = (pdf_page.rect * mat).irect
+        if irect.width * irect.height * (1 if grayscale else 3) > TILED_RENDER_BYTES:
+            return self._render_page_tiled(pdf_page, scale, irect, grayscale)
 
-        if pix.alpha:
-            fmt = QImage.Format.Format_RGBA8888
+        if grayscale:
+            pix = pdf_page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+            fmt = QImage.Format.Format_Grayscale8
         else:
-            fmt = QImage.Format.Format_RGB888
-
-        return QImage(pix.samples, pix.width, pix.height, pix.stride, fmt).copy()
+            pix = pdf_page.get_pixmap(matrix=mat)
+            if pix.alpha:
+                fmt = QImage.Format.Format_RGBA8888
+            else:
+                fmt = QImage.Format.Format_RGB888
+
+        # Wrap the pixmap's buffer without copying; copy() makes the only copy
+        image = QImage(pix.samples_mv, pix.width, pix.height, pix.stride, fmt).copy()
+        # The copy owns its bytes: drop the pixmap now and let MuPDF give back
+        # its cached render resources instead of growing with every page exported
+        pix = None
+        fitz.TOOLS.store_shrink(100)
+        return image
+
+    def _render_page_tiled(self, pdf_page: fitz.Page, scale: float, irect: fitz.IRect,
+                           grayscale: bool) -> QImage:
+        """Render a large page tile by tile into one QImage, bounding peak memory."""
+        mat = fitz.Matrix(scale, scale)
+        if grayscale:
+            colorspace, fmt = fitz.csGRAY, QImage.Format.Format_Grayscale8
+        else:
+            colorspace, fmt = fitz.csRGB, QImage.Format.Format_RGB888
+
+        image = QImage(irect.width, irect.height, fmt)
+        image.fill(Qt.GlobalColor.white)
+        painter = QPainter(image)
+        for ty in range(irect.y0, irect.y1, RENDER_TILE_SIZE):
+            for tx in range(irect.x0, irect.x1, RENDER_TILE_SIZE):
+                clip = fitz.Rect(tx / scale, ty / scale,
+                                 (tx + RENDER_TILE_SIZE) / scale, (ty + RENDER_TILE_SIZE) / scale)
+                pix = pdf_page.get_pixmap(matrix=mat, clip=clip, colorspace=colorspace, alpha=False)
+                tile = QImage(pix.samples_mv, pix.width, pix.height, pix.stride, fmt)
+                # pix.x/pix.y is the tile's device position
+                painter.drawImage(pix.x - irect.x0, pix.y - irect.y0, tile)
+                tile = None
+                pix = None
+        painter.end()
+        fitz.TOOLS.store_shrink(100)
+        return image
 
     def refresh_xrefs_after_save(self):
-        """Refresh annotation xrefs after saving (xrefs may change during save)."""
+        """Refresh annotation xrefs after saving (xrefs may change during save).
+
+        Every page is matched right away: position matching relies on the
+        geometry the annotations had when saved, which later renumbering or
+        style edits would change.
+        """
         if not self._doc:
             return
+        for page_num in self._annotations.pages():
+            self._match_page_xrefs(page_num)
 
-        for annotation in self._annotations.all():
-            style = annotation.style
-            expected_rect, base_text, has_p_suffix, p_fontsize, text_width, text_height = calc_annotation_rect(annotation)
-            padding = style.padding
-            base_width = _HELV_FONT.text_length(base_text, fontsize=style.font_size)
+    def _match_page_xrefs(self, page_num: int):
+        """Match the xrefs of one page's annotations against the page's PDF annotations."""
+        page_annotations = self._annotations.get_for_page(page_num)
+        if not page_annotations:
+            return
 
-            # Calculate expected 'p' position
-            p_x = expected_rect.x0 + padding + base_width
-            p_y = expected_rect.y0 + padding + text_height * 0.5
+        # Scan the page's annotations once; main annotations carry our ID in
+        # /Name, the rest (and unnamed ones) are matched by position
+        named = set()
+        free_texts = {}
+        lines = []
+        doc = self._doc
+        page = doc.load_page(page_num)
+        # Let MuPDF skip other annotation types, and read /Subtype and /Name
+        # straight from the object instead of building annot.type / annot.info
+        for annot in page.annots(types=(fitz.PDF_ANNOT_FREE_TEXT, fitz.PDF_ANNOT_LINE)):
+            xref = annot.xref
+            if doc.xref_get_key(xref, "Subtype")[1] == "/FreeText":
+                # Plain float tuples: annot.rect builds a new Rect on every access
+                rect = annot.rect
+                # Bucket by top-left corner so matching only looks at nearby rects
+                cell = (int(rect.x0 // XREF_MATCH_CELL), int(rect.y0 // XREF_MATCH_CELL))
+                free_texts.setdefault(cell, []).append((xref, *rect))
+                # Our ID is a PDF name object, "/<id>" (/NM holds MuPDF's own ID)
+                key_type, name = doc.xref_get_key(xref, "Name")
+                annotation = self._annotations.get(name[1:]) if key_type == "name" else None
+                if annotation is not None and annotation.page == page_num:
+                    annotation.pdf_annot_xref = xref
+                    named.add(annotation.id)
+            else:
+                vertices = annot.vertices
+                if vertices and len(vertices) >= 2:
+                    lines.append((xref, *vertices[0], *vertices[1]))
 
-            # Calculate expected tail position
-            center_x = expected_rect.x0 + (expected_rect.width / 2)
-            tail_start_y = expected_rect.y1
-            tail_end_y = tail_start_y + style.tail_length
+        for annotation in page_annotations:
+            self._match_annotation_xrefs(annotation, free_texts, lines, annotation.id in named)
 
-            # Find matching annotation in PDF
-            page = self._doc.load_page(annotation.page)
-            for annot in page.annots():
-                if annot.type[0] == fitz.PDF_ANNOT_FREE_TEXT:
-                    annot_rect = annot.rect
-                    if (abs(annot_rect.x0 - expected_rect.x0) < 2 and
-                        abs(annot_rect.y0 - expected_rect.y0) < 2 and
-                        abs(annot_rect.x1 - expected_rect.x1) < 2 and
-                        abs(annot_rect.y1 - expected_rect.y1) < 2):
-                        annotation.pdf_annot_xref = annot.xref
-                        break
+    def _match_annotation_xrefs(self, annotation: NumberAnnotation, free_texts: dict, lines: list, named: bool):
+        """Match one annotation's main/'p'/tail xrefs against a page's scanned annotations.
 
-            # Find matching 'p' annotation if has suffix
-            if has_p_suffix:
-                for annot in page.annots():
-                    if annot.type[0] == fitz.PDF_ANNOT_FREE_TEXT:
-                        annot_rect = annot.rect
-                        if (abs(annot_rect.x0 - p_x) < 5 and
-                            abs(annot_rect.y0 - p_y) < 5 and
-                            annot_rect.width < text_height):
-                            annotation.pdf_p_xref = annot.xref
-                            break
-
-            # Find matching tail annotation (Line type)
-            if style.tail_enabled:
-                for annot in page.annots():
-                    if annot.type[0] == fitz.PDF_ANNOT_LINE:
-                        vertices = annot.vertices
-                        if vertices and len(vertices) >= 2:
-                            start = vertices[0]
-                            end = vertices[1]
-                            if (abs(start[0] - center_x) < 3 and
-                                abs(start[1] - tail_start_y) < 3 and
-                                abs(end[0] - center_x) < 3 and
-                                abs(end[1] - tail_end_y) < 3):
-                                annotation.pdf_tail_xref = annot.xref
-                                break
+        free_texts maps XREF_MATCH_CELL cells of the top-left corner to
+        (xref, x0, y0, x1, y1) tuples; lines holds (xref, x0, y0, x1, y1)
+        tuples with a line's start and end points.
+        """
+        style = annotation.style
+        expected_rect, *_ = calc_annotation_rect(annotation)
+        _, has_p_suffix, _, base_width, _, _, text_height = text_metrics(style, annotation.number)
+        padding = style.padding
+
+        # Calculate expected 'p' position
+        p_x = expected_rect.x0 + padding + base_width
+        p_y = expected_rect.y0 + padding + text_height * 0.5
+
+        # Calculate expected tail position
+        center_x = expected_rect.x0 + (expected_rect.width / 2)
+        tail_start_y = expected_rect.y1
+        tail_end_y = tail_start_y + style.tail_length
+
+        # Find matching annotation in PDF (by position, if not found by name)
+        if not named:
+            ex0, ey0, ex1, ey1 = expected_rect
+            for xref, x0, y0, x1, y1 in _near_rects(free_texts, ex0, ey0):
+                if (abs(x0 - ex0) < 2 and
+                    abs(y0 - ey0) < 2 and
+                    abs(x1 - ex1) < 2 and
+                    abs(y1 - ey1) < 2):
+                    annotation.pdf_annot_xref = xref
+                    break
+
+        # Find matching 'p' annotation if has suffix
+        if has_p_suffix:
+            for xref, x0, y0, x1, _ in _near_rects(free_texts, p_x, p_y):
+                if (abs(x0 - p_x) < 5 and
+                    abs(y0 - p_y) < 5 and
+                    x1 - x0 < text_height):
+                    annotation.pdf_p_xref = xref
+                    break
+
+        # Find matching tail annotation (Line type)
+        if style.tail_enabled:
+            for xref, sx, sy, ex, ey in lines:
+                if (abs(sx - center_x) < 3 and
+                    abs(sy - tail_start_y) < 3 and
+                    abs(ex - center_x) < 3 and
+                    abs(ey - tail_end_y) < 3):
+                    annotation.pdf_tail_xref = xref
+                    break
 
     def save_metadata_to_pdf(self):
-        """Save our annotation data as JSON in PDF metadata."""
+        """Save our annotation data as JSON in a compressed stream referenced from the catalog."""
         if not self._doc:
             return
 
-        # Serialize annotation store to JSON
-        annotations_json = self._annotations.to_json()
+        # Serialize annotation store to compact JSON bytes (nobody reads it by hand)
+        annotations_json = self._annotations.to_json_bytes()
 
-        # Get current metadata and add our data
-        metadata = self._doc.metadata or {}
-        metadata["keywords"] = f"{NAPISY_METADATA_KEY}:{annotations_json}"
+        # Reuse our stream object if the document already has one
+        catalog = self._doc.pdf_catalog()
+        key_type, value = self._doc.xref_get_key(catalog, NAPISY_DATA_KEY)
+        if key_type == "xref":
+            xref = int(value.split()[0])
+        else:
+            xref = self._doc.get_new_xref()
+            self._doc.update_object(xref, "<<>>")
+            self._doc.xref_set_key(catalog, NAPISY_DATA_KEY, f"{xref} 0 R")
+        self._doc.update_stream(xref, annotations_json, compress=True)
 
-        # Set metadata
-        self._doc.set_metadata(metadata)
+        # Drop the legacy copy from /Keywords, it is superseded by the stream
+        metadata = self._doc.metadata or {}
+        if metadata.get("keywords", "").startswith(_NAPISY_PREFIX):
+            metadata["keywords"] = ""
+            self._doc.set_metadata(metadata)
+
+    def _read_annotation_data(self) -> Optional[bytes]:
+        """Return our stored annotation JSON, from the data stream or legacy /Keywords."""
+        key_type, value = self._doc.xref_get_key(self._doc.pdf_catalog(), NAPISY_DATA_KEY)
+        if key_type == "xref":
+            return self._doc.xref_stream(int(value.split()[0]))
+
+        metadata = self._doc.metadata
+        if not metadata:
+            return None
+        keywords = metadata.get("keywords", "")
+        if not keywords or not keywords.startswith(_NAPISY_PREFIX):
+            return None
+        # JSON after our marker
+        return keywords[_NAPISY_PREFIX_LEN:].encode("utf-8")
 
     def load_metadata_from_pdf(self) -> bool:
         """Load our annotation data from PDF metadata. Returns True if found."""
@@ -1191,24 +1775,15 @@ class PDFViewer(QGraphicsView):
             return False
 
         try:
-            metadata = self._doc.metadata
-            if not metadata:
+            json_data = self._read_annotation_data()
+            if not json_data:
                 return False
 
-            keywords = metadata.get("keywords", "")
-            if not keywords or not keywords.startswith(f"{NAPISY_METADATA_KEY}:"):
-                return False
-
-            # Extract JSON after our marker
-            json_str = keywords[len(f"{NAPISY_METADATA_KEY}:"):]
-
             # Parse and restore annotations
-            self._annotations.from_json(json_str)
-
-            # Match annotations to PDF annotation xrefs by name (/NM)
-            self._sync_xrefs_by_name()
+            self._annotations.from_json(json_data)
 
-            # Also sync 'p' and tail annotation xrefs by position
+            # Match annotations to PDF annotation xrefs by name (/Name), and
+            # 'p'/tail (and unnamed) annotation xrefs by position
             self.refresh_xrefs_after_save()
 
             return True
@@ -1216,20 +1791,3 @@ class PDFViewer(QGraphicsView):
         except Exception as e:
             logger.error("Error loading metadata: %s", e)
             return False
-
-    def _sync_xrefs_by_name(self):
-        """Sync annotation xrefs by matching /NM field to our annotation IDs."""
-        if not self._doc:
-            return
-
-        # Build a map of annotation ID -> annotation
-        id_to_annotation = {a.id: a for a in self._annotations.all()}
-
-        # Scan all pages for annotations with matching names
-        for page_num in range(self._doc.page_count):
-            page = self._doc.load_page(page_num)
-            for annot in page.annots():
-                if annot.type[0] == fitz.PDF_ANNOT_FREE_TEXT:
-                    name = annot.info.get("name", "")
-                    if name in id_to_annotation:
-                        id_to_annotation[name].pdf_annot_xref = annot.xref
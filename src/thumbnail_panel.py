@@ -5,20 +5,47 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QScrollArea, QLabel, QFrame,
     QSizePolicy
 )
-from PySide6.QtCore import Qt, Signal, QSize
+from PySide6.QtCore import Qt, Signal, QSize, QTimer
 from PySide6.QtGui import QPixmap, QImage, QPainter, QColor, QPen
 from typing import Optional
 
+# Off-screen thumbnails rendered ahead on each side of the viewport, after
+# the visible ones
+THUMB_LOOKAHEAD = 4
+
+# Empty MuPDF's resource store after this many thumbnail renders
+THUMB_STORE_SHRINK_INTERVAL = 16
+
 
 class ThumbnailWidget(QFrame):
     """Single page thumbnail."""
 
     clicked = Signal(int)  # page index
 
+    _STYLE_SELECTED = """
+        ThumbnailWidget {
+            border: 2px solid #0078D7;
+            background-color: #E5F1FB;
+        }
+    """
+    _STYLE_NORMAL = """
+        ThumbnailWidget {
+            border: 1px solid #CCCCCC;
+            background-color: #F5F5F5;
+        }
+        ThumbnailWidget:hover {
+            border: 1px solid #0078D7;
+            background-color: #F0F0F0;
+        }
+    """
+
     def __init__(self, page_index: int, parent=None):
         super().__init__(parent)
         self.page_index = page_index
         self._selected = False
+        self._has_annotations = False
+        self._label_plain = f"{page_index + 1}"
+        self._label_dot = f"{page_index + 1} •"
 
         self.setFixedSize(120, 160)
         self.setFrameStyle(QFrame.Shape.Box)
@@ -31,55 +58,60 @@ class ThumbnailWidget(QFrame):
         self._image_label = QLabel()
         self._image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self._image_label.setStyleSheet("background-color: white;")
+        # The pixmap is set at its final size; never rescale it on paint
+        self._image_label.setScaledContents(False)
         layout.addWidget(self._image_label, 1)
 
-        self._page_label = QLabel(f"{page_index + 1}")
+        self._page_label = QLabel(self._label_plain)
         self._page_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self._page_label.setStyleSheet("font-size: 10px;")
         layout.addWidget(self._page_label)
 
         self._update_style()
 
+    def image_size(self) -> QSize:
+        """Size available for the thumbnail image.
+
+        Derived from the fixed widget size rather than the label's geometry,
+        which is not valid until the layout has run.
+        """
+        layout = self.layout()
+        margins = layout.contentsMargins()
+        contents = self.contentsRect()
+        width = contents.width() - margins.left() - margins.right()
+        height = (contents.height() - margins.top() - margins.bottom()
+                  - layout.spacing() - self._page_label.sizeHint().height())
+        return QSize(max(width, 1), max(height, 1))
+
     def set_thumbnail(self, pixmap: QPixmap):
         """Set the thumbnail image."""
-        scaled = pixmap.scaled(
-            self._image_label.size(),
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        )
-        self._image_label.setPixmap(scaled)
+        size = self.image_size()
+        # Rendered at the label size, so this is only a fallback for pixmaps
+        # from elsewhere; a fast resample is good enough
+        if pixmap.width() > size.width() or pixmap.height() > size.height():
+            pixmap = pixmap.scaled(
+                size,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.FastTransformation
+            )
+        self._image_label.setPixmap(pixmap)
 
     def set_selected(self, selected: bool):
         """Set selection state."""
+        if selected == self._selected:
+            return
         self._selected = selected
         self._update_style()
 
     def set_has_annotations(self, has_annotations: bool):
         """Show indicator if page has annotations."""
-        if has_annotations:
-            self._page_label.setText(f"{self.page_index + 1} •")
-        else:
-            self._page_label.setText(f"{self.page_index + 1}")
+        if has_annotations == self._has_annotations:
+            return
+        self._has_annotations = has_annotations
+        self._page_label.setText(self._label_dot if has_annotations else self._label_plain)
 
     def _update_style(self):
-        if self._selected:
-            self.setStyleSheet("""
-                ThumbnailWidget {
-                    border: 2px solid #0078D7;
-                    background-color: #E5F1FB;
-                }
-            """)
-        else:
-            self.setStyleSheet("""
-                ThumbnailWidget {
-                    border: 1px solid #CCCCCC;
-                    background-color: #F5F5F5;
-                }
-                ThumbnailWidget:hover {
-                    border: 1px solid #0078D7;
-                    background-color: #F0F0F0;
-                }
-            """)
+        self.setStyleSheet(self._STYLE_SELECTED if self._selected else self._STYLE_NORMAL)
 
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -97,6 +129,22 @@ class ThumbnailPanel(QScrollArea):
         self._doc: Optional[fitz.Document] = None
         self._thumbnails: list[ThumbnailWidget] = []
         self._current_page = 0
+        # Render thumbnails as 8-bit gray (a third of the RGB size)
+        self._grayscale = False
+        # Pages whose thumbnail has been rendered; the rest are rendered
+        # when they first scroll into view
+        self._rendered: set[int] = set()
+        self._renders_since_shrink = 0
+        # Render matrices by (page size, thumbnail size); pages of a document
+        # usually share one size, so they share one matrix
+        self._matrix_cache: dict[tuple[float, float, int, int], fitz.Matrix] = {}
+        # Visible pages still to render, one per event-loop pass so the UI
+        # stays responsive; replaced on every scroll, dropping stale pages
+        self._pending: list[int] = []
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.setInterval(0)
+        self._render_timer.timeout.connect(self._render_next)
 
         # Setup scroll area
         self.setWidgetResizable(True)
@@ -104,21 +152,25 @@ class ThumbnailPanel(QScrollArea):
         self.setMinimumWidth(140)
         self.setMaximumWidth(160)
 
-        # Container widget
+        self._build_container()
+        self.verticalScrollBar().valueChanged.connect(self._render_visible)
+
+    def _build_container(self):
+        """Create the (empty) container widget holding the placeholder and thumbnails."""
         self._container = QWidget()
         self._layout = QVBoxLayout(self._container)
         self._layout.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter)
         self._layout.setSpacing(8)
         self._layout.setContentsMargins(8, 8, 8, 8)
 
-        self.setWidget(self._container)
-
         # Placeholder
         self._placeholder = QLabel("No document\nloaded")
         self._placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self._placeholder.setStyleSheet("color: #888888;")
         self._layout.addWidget(self._placeholder)
 
+        self.setWidget(self._container)
+
     def set_document(self, doc: fitz.Document):
         """Set the PDF document and generate thumbnails."""
         self._doc = doc
@@ -130,15 +182,15 @@ class ThumbnailPanel(QScrollArea):
 
         self._placeholder.setVisible(False)
 
-        # Generate thumbnails
+        # Create empty thumbnails; pages are rendered once visible
         for i in range(doc.page_count):
             thumb = ThumbnailWidget(i)
             thumb.clicked.connect(self._on_thumbnail_clicked)
             self._layout.addWidget(thumb)
             self._thumbnails.append(thumb)
 
-            # Render thumbnail
-            self._render_thumbnail(i)
+        # After the layout has positioned the new widgets
+        QTimer.singleShot(0, self._render_visible)
 
         # Select first page
         if self._thumbnails:
@@ -147,36 +199,103 @@ class ThumbnailPanel(QScrollArea):
 
     def _clear_thumbnails(self):
         """Remove all thumbnail widgets."""
-        for thumb in self._thumbnails:
-            self._layout.removeWidget(thumb)
-            thumb.deleteLater()
+        if self._thumbnails:
+            # Replace the whole container: deleting it disposes of all the
+            # thumbnails at once instead of relayouting after each removal
+            old = self.takeWidget()
+            old.deleteLater()
+            self._build_container()
         self._thumbnails.clear()
+        self._rendered.clear()
+        self._pending = []
+        self._render_timer.stop()
         self._placeholder.setVisible(True)
 
+    def _render_visible(self):
+        """Queue the unrendered thumbnails around the viewport, most relevant first.
+
+        Order: the selected page if visible, the other visible pages, then up
+        to THUMB_LOOKAHEAD pages past each edge of the viewport.
+        """
+        if not self._doc:
+            return
+        visible = self.viewport().rect()
+        offset = self._container.pos()
+        shown = []
+        for i, thumb in enumerate(self._thumbnails):
+            geometry = thumb.geometry().translated(offset)
+            if geometry.top() > visible.bottom():
+                # Thumbnails are stacked top to bottom
+                break
+            if geometry.intersects(visible):
+                shown.append(i)
+        if not shown:
+            return
+
+        first, last = shown[0], shown[-1]
+        if self._current_page in shown:
+            shown.remove(self._current_page)
+            shown.insert(0, self._current_page)
+        ahead = list(range(last + 1, min(last + 1 + THUMB_LOOKAHEAD, len(self._thumbnails))))
+        behind = list(range(first - 1, max(first - 1 - THUMB_LOOKAHEAD, -1), -1))
+        self._pending = [i for i in shown + ahead + behind if i not in self._rendered]
+        if self._pending:
+            self._render_timer.start()
+
+    def _render_next(self):
+        """Render one queued thumbnail, then yield to the event loop."""
+        if not self._pending:
+            return
+        page_index = self._pending.pop(0)
+        if page_index not in self._rendered:
+            self._render_thumbnail(page_index)
+        if self._pending:
+            self._render_timer.start()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._render_visible()
+
     def _render_thumbnail(self, page_index: int):
         """Render a single page thumbnail."""
         if not self._doc or page_index >= len(self._thumbnails):
             return
 
+        size = self._thumbnails[page_index].image_size()
         page = self._doc.load_page(page_index)
 
-        # Calculate scale for thumbnail
-        thumb_width = 100
-        scale = thumb_width / page.rect.width
-
-        mat = fitz.Matrix(scale, scale)
-        pix = page.get_pixmap(matrix=mat)
-
-        # Convert to QPixmap
-        if pix.alpha:
-            fmt = QImage.Format.Format_RGBA8888
+        # Render straight at the size the thumbnail shows, no rescaling afterwards
+        width = round(page.rect.width, 2)
+        height = round(page.rect.height, 2)
+        key = (width, height, size.width(), size.height())
+        mat = self._matrix_cache.get(key)
+        if mat is None:
+            scale = min(size.width() / width, size.height() / height)
+            mat = fitz.Matrix(scale, scale)
+            self._matrix_cache[key] = mat
+
+        if self._grayscale:
+            pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+            fmt = QImage.Format.Format_Grayscale8
         else:
+            # Thumbnails need no transparency: 3 bytes per pixel
+            pix = page.get_pixmap(matrix=mat, alpha=False)
             fmt = QImage.Format.Format_RGB888
 
-        img = QImage(pix.samples, pix.width, pix.height, pix.stride, fmt).copy()
+        # Wrap the pixmap's buffer without copying; fromImage() makes the only copy
+        img = QImage(pix.samples_mv, pix.width, pix.height, pix.stride, fmt)
         pixmap = QPixmap.fromImage(img)
+        # The QPixmap owns its pixels: release MuPDF's buffer right away
+        img = None
+        pix = None
+        page = None
+        self._renders_since_shrink += 1
+        if self._renders_since_shrink >= THUMB_STORE_SHRINK_INTERVAL:
+            self._renders_since_shrink = 0
+            fitz.TOOLS.store_shrink(100)
 
         self._thumbnails[page_index].set_thumbnail(pixmap)
+        self._rendered.add(page_index)
 
     def _on_thumbnail_clicked(self, page_index: int):
         """Handle thumbnail click."""
@@ -198,6 +317,8 @@ class ThumbnailPanel(QScrollArea):
 
         # Scroll to visible
         self.ensureWidgetVisible(self._thumbnails[page_index])
+        if page_index not in self._rendered:
+            self._render_thumbnail(page_index)
 
     def update_annotation_indicators(self, annotations_by_page: dict[int, int]):
         """Update annotation indicators on thumbnails.
@@ -208,11 +329,31 @@ class ThumbnailPanel(QScrollArea):
         for i, thumb in enumerate(self._thumbnails):
             thumb.set_has_annotations(annotations_by_page.get(i, 0) > 0)
 
+    def set_grayscale(self, grayscale: bool):
+        """Render thumbnails in grayscale instead of colour."""
+        if grayscale == self._grayscale:
+            return
+        self._grayscale = grayscale
+        self._rendered.clear()
+        self._render_visible()
+
     def refresh_thumbnail(self, page_index: int):
-        """Refresh a specific thumbnail."""
-        self._render_thumbnail(page_index)
+        """Refresh a specific thumbnail.
+
+        Queued rather than rendered immediately, so a burst of refreshes for the
+        same page (several edits in a row) renders it only once.
+        """
+        if page_index not in self._rendered:
+            # Never shown yet, or already queued: rendered with current content anyway
+            return
+        self._rendered.discard(page_index)
+        if page_index not in self._pending:
+            self._pending.append(page_index)
+        self._render_timer.start()
 
     def clear(self):
         """Clear all thumbnails."""
         self._doc = None
         self._clear_thumbnails()
+        self._matrix_cache.clear()
+        fitz.TOOLS.store_shrink(100)
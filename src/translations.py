@@ -136,6 +136,15 @@ TRANSLATIONS = {
 }
 
 
+# dict.get of the current language's table, rebound by Translator.set_language
+_lookup = TRANSLATIONS["pl"].get
+
+
+def tr(text: str) -> str:
+    """Translate text to current language."""
+    return _lookup(text, text)
+
+
 class Translator:
     """Simple translator class."""
 
@@ -150,20 +159,12 @@ class Translator:
 
     @classmethod
     def set_language(cls, lang: str):
+        global _lookup
         cls._language = lang
+        _lookup = TRANSLATIONS.get(lang, {}).get
 
     @classmethod
     def get_language(cls) -> str:
         return cls._language
 
-    @classmethod
-    def tr(cls, text: str) -> str:
-        """Translate text to current language."""
-        if cls._language == "en":
-            return text
-        return TRANSLATIONS.get(cls._language, {}).get(text, text)
-
-
-def tr(text: str) -> str:
-    """Shortcut function for translation."""
-    return Translator.tr(text)
+    tr = staticmethod(tr)
@@ -1,11 +1,13 @@
 """Undo/Redo manager for annotation operations."""
 
+from collections import deque
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import Any, Callable, Optional
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, QTimer, Signal
 
 
-@dataclass
+@dataclass(slots=True)
 class UndoAction:
     """Represents a single undoable action."""
     description: str
@@ -22,63 +24,103 @@ class UndoManager(QObject):
 
     def __init__(self, max_history: int = 50):
         super().__init__()
-        self._undo_stack: list[UndoAction] = []
-        self._redo_stack: list[UndoAction] = []
-        self._max_history = max_history
+        # Bounded: appending beyond max_history drops the oldest action in O(1)
+        self._undo_stack: deque[UndoAction] = deque(maxlen=max_history)
+        self._redo_stack: deque[UndoAction] = deque(maxlen=max_history)
+        self._pending: list[UndoAction] = []  # Pushed but not yet committed to the stack
+        # Nesting depth of batch() blocks; state changes inside them are
+        # reported with one state_changed when the outermost block exits
+        self._batch_depth = 0
+        self._batch_dirty = False
+
+    @contextmanager
+    def batch(self):
+        """Coalesce the state_changed emissions of several operations into one."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batch_dirty:
+                self._batch_dirty = False
+                self.state_changed.emit()
+
+    def _notify_state_changed(self) -> None:
+        if self._batch_depth:
+            self._batch_dirty = True
+        else:
+            self.state_changed.emit()
 
     def push(self, action: UndoAction) -> None:
-        """Push a new action onto the undo stack."""
-        self._undo_stack.append(action)
+        """Queue a new action for the undo stack.
+
+        Actions are committed on the next event-loop tick, so a burst of pushes
+        from one handler results in a single state_changed emission.
+        """
+        if not self._pending:
+            QTimer.singleShot(0, self._flush_pending)
+        self._pending.append(action)
+
+    def _flush_pending(self) -> None:
+        """Commit queued actions to the undo stack."""
+        if not self._pending:
+            return
+
+        self._undo_stack.extend(self._pending)
+        self._pending.clear()
         self._redo_stack.clear()  # Clear redo on new action
-
-        # Limit history size
-        if len(self._undo_stack) > self._max_history:
-            self._undo_stack.pop(0)
-
-        self.state_changed.emit()
+        self._notify_state_changed()
 
     def undo(self) -> Optional[str]:
         """Undo the last action. Returns action description or None."""
-        if not self._undo_stack:
-            return None
-
-        action = self._undo_stack.pop()
-        action.undo_func(action.undo_data)
-        self._redo_stack.append(action)
-        self.state_changed.emit()
+        # Committing pending actions and undoing report a single state change
+        with self.batch():
+            self._flush_pending()
+            if not self._undo_stack:
+                return None
+
+            action = self._undo_stack.pop()
+            action.undo_func(action.undo_data)
+            self._redo_stack.append(action)
+            self._notify_state_changed()
         return action.description
 
     def redo(self) -> Optional[str]:
         """Redo the last undone action. Returns action description or None."""
-        if not self._redo_stack:
-            return None
-
-        action = self._redo_stack.pop()
-        action.redo_func(action.redo_data)
-        self._undo_stack.append(action)
-        self.state_changed.emit()
+        with self.batch():
+            self._flush_pending()
+            if not self._redo_stack:
+                return None
+
+            action = self._redo_stack.pop()
+            action.redo_func(action.redo_data)
+            self._undo_stack.append(action)
+            self._notify_state_changed()
         return action.description
 
     def can_undo(self) -> bool:
-        return len(self._undo_stack) > 0
+        return len(self._undo_stack) > 0 or len(self._pending) > 0
 
     def can_redo(self) -> bool:
-        return len(self._redo_stack) > 0
+        return len(self._redo_stack) > 0 and not self._pending
 
     def undo_description(self) -> Optional[str]:
         """Get description of next undo action."""
+        if self._pending:
+            return self._pending[-1].description
         if self._undo_stack:
             return self._undo_stack[-1].description
         return None
 
     def redo_description(self) -> Optional[str]:
         """Get description of next redo action."""
-        if self._redo_stack:
+        if self._redo_stack and not self._pending:
             return self._redo_stack[-1].description
         return None
 
     def clear(self) -> None:
         """Clear all undo/redo history."""
+        self._pending.clear()
         self._undo_stack.clear()
         self._redo_stack.clear()
-        self.state_changed.emit()
+        self._notify_state_changed()
@@ -1,10 +1,12 @@
 """Tests for data models: parsing, validation, sorting, and serialization."""
 
+import dataclasses
 import json
 import pytest
 from src.models import (
     parse_number, format_number, compare_numbers, sort_key,
     NumberStyle, NumberAnnotation, AnnotationStore, StylePresets,
+    _intern_style,
 )
 
 
@@ -36,6 +38,10 @@ class TestParseNumber:
         with pytest.raises(ValueError):
             parse_number("abc")
 
+    def test_extra_dot_raises(self):
+        with pytest.raises(ValueError):
+            parse_number("1.2.3")
+
 
 # --- format_number ---
 
@@ -109,6 +115,23 @@ class TestNumberStyle:
         s = NumberStyle.from_dict({"font_size": 36, "nonexistent": True})
         assert s.font_size == 36
 
+    def test_from_dict_interns_equal_styles(self):
+        s1 = NumberStyle.from_dict({"font_size": 30})
+        s2 = NumberStyle.from_dict({"font_size": 30})
+        assert s1 is s2
+
+    def test_style_intern_table_is_bounded(self):
+        for size in range(1000):
+            NumberStyle.from_dict({"font_size": size})
+        info = _intern_style.cache_info()
+        assert info.currsize <= info.maxsize
+
+    def test_replace_derives_new_style(self):
+        s = NumberStyle()
+        s2 = dataclasses.replace(s, font_size=48)
+        assert s.font_size == 24
+        assert s2.font_size == 48
+
 
 # --- NumberAnnotation ---
 
@@ -133,6 +156,34 @@ class TestNumberAnnotation:
         assert a2.x == 10.5
         assert a2.number == "7"
 
+    def test_ids_are_unique(self):
+        ids = {NumberAnnotation().id for _ in range(1000)}
+        assert len(ids) == 1000
+
+    def test_from_dict_ignores_legacy_keys(self):
+        a = NumberAnnotation.from_dict({"number": "4", "applied_to_pdf": True, "_sort_key": [9, 9]})
+        assert a.number == "4"
+        assert a.sort_key() == (4, 0)
+
+    def test_legacy_uuid_id_kept(self):
+        legacy = "123e4567-e89b-12d3-a456-426614174000"
+        a = NumberAnnotation.from_dict({"id": legacy, "number": "1"})
+        assert a.id == legacy
+
+    def test_sort_key_follows_number(self):
+        a = NumberAnnotation(number="3.2")
+        assert a.sort_key() == (3, 2)
+        AnnotationStore().set_number(a, "10")
+        assert a.sort_key() == (10, 0)
+
+    def test_copy_gets_new_id_and_shares_style(self):
+        a = NumberAnnotation(page=1, x=5.0, y=6.0, number="3", pdf_annot_xref=12)
+        c = a.copy()
+        assert c.pdf_annot_xref == 0
+        assert c.id != a.id
+        assert (c.page, c.x, c.y, c.number) == (1, 5.0, 6.0, "3")
+        assert c.style is a.style
+
     def test_from_dict_number_coerced(self):
         d = {"id": "test", "page": 0, "x": 0, "y": 0, "number": 5,
              "pdf_annot_xref": 0, "pdf_tail_xref": 0, "pdf_p_xref": 0}
@@ -183,11 +234,95 @@ class TestAnnotationStore:
         assert len(store.get_for_page(0)) == 2
         assert len(store.get_for_page(1)) == 1
 
+    def test_get_for_page_after_remove(self):
+        store = AnnotationStore()
+        a = NumberAnnotation(number="1", page=3)
+        store.add(a)
+        store.add(NumberAnnotation(number="2", page=3))
+        store.remove(a.id)
+        assert [x.number for x in store.get_for_page(3)] == ["2"]
+        assert store.get_for_page(7) == []
+
+    def test_pages(self):
+        store = AnnotationStore()
+        a = NumberAnnotation(number="1", page=2)
+        store.add(a)
+        store.add(NumberAnnotation(number="2", page=5))
+        assert store.pages() == {2, 5}
+        store.remove(a.id)
+        assert store.pages() == {5}
+
+    def test_number_index_follows_renumbering(self):
+        store = self._make_store(["1", "2p", "3"])
+        store.advance_numbers_from("2", 1)
+        assert store.has_number("2") is False
+        assert store.get_by_number("3").number == "3p"
+        assert store.get_by_number("4").number == "4"
+        store.set_number(store.get_by_number("1"), "9")
+        assert store.has_number("1") is False
+        assert store.has_number("9") is True
+
     def test_all_sorted(self):
         store = self._make_store(["3", "1", "2.1", "2"])
         nums = [a.number for a in store.all_sorted()]
         assert nums == ["1", "2", "2.1", "3"]
 
+    def test_all_sorted_after_set_number(self):
+        store = self._make_store(["1", "2", "3"])
+        store.all_sorted()
+        store.set_number(store.get_by_number("1"), "4")
+        nums = [a.number for a in store.all_sorted()]
+        assert nums == ["2", "3", "4"]
+
+    def test_all_sorted_after_add_and_remove(self):
+        store = self._make_store(["1", "3"])
+        store.all_sorted()
+        store.add(NumberAnnotation(number="2.1"))
+        store.remove(store.get_by_number("1").id)
+        store.add(NumberAnnotation(number="0"))
+        nums = [a.number for a in store.all_sorted()]
+        assert nums == ["0", "2.1", "3"]
+        assert store.get_next_sub_number("2") == "2.2"
+        assert store.get_next_number() == "4"
+
+    def test_all_sorted_ties_keep_store_order(self):
+        store = AnnotationStore()
+        first = NumberAnnotation(number="2")
+        store.add(first)
+        store.all_sorted()
+        second = NumberAnnotation(number="3")
+        store.add(second)
+        third = NumberAnnotation(number="2p")
+        store.add(third)
+        # Renumbered into the tie, but added to the store before `third`
+        store.set_number(second, "2")
+        ids = [a.id for a in store.all_sorted()]
+        assert ids == [first.id, second.id, third.id]
+        assert ids == [a.id for a in sorted(store.all(), key=lambda a: a.sort_key())]
+
+    def test_shift_into_tie_keeps_store_order(self):
+        store = AnnotationStore()
+        later = NumberAnnotation(number="3")
+        store.add(later)
+        earlier = NumberAnnotation(number="2")
+        store.add(earlier)
+        store.all_sorted()
+        # "3" becomes "2" and ties with an annotation added after it
+        store.decrease_numbers_from("2", 1)
+        assert [a.id for a in store.all_sorted()] == [later.id, earlier.id]
+
+    def test_decrease_keeps_order(self):
+        store = self._make_store(["1", "2.1", "3", "4p"])
+        store.all_sorted()
+        store.decrease_numbers_from("2", 1)
+        nums = [a.number for a in store.all_sorted()]
+        assert nums == ["1", "2", "2.1", "3p"]
+
+    def test_get_numbers_from(self):
+        store = self._make_store(["1", "2", "2.1", "3p", "5", "4.1"])
+        nums = [a.number for a in store.get_numbers_from("2")]
+        assert nums == ["2", "3p", "5"]
+
     def test_has_number(self):
         store = self._make_store(["5", "10"])
         assert store.has_number("5") is True
@@ -222,6 +357,10 @@ class TestAnnotationStore:
         store = self._make_store(["1", "2", "3"])
         assert store.find_gaps() == []
 
+    def test_find_gaps_ignores_sub_numbers(self):
+        store = self._make_store(["3", "3.1", "6p", "4.2"])
+        assert store.find_gaps() == [4, 5]
+
     def test_find_gaps_empty(self):
         store = AnnotationStore()
         assert store.find_gaps() == []
@@ -266,9 +405,33 @@ class TestAnnotationStore:
         store2 = AnnotationStore()
         store2.from_json(json_str)
         assert store2.count() == 3
+        assert len(store2.get_for_page(0)) == 3
         assert store2.has_number("2.1")
         assert store2.has_number("3")
 
+    def test_compact_json_roundtrip(self):
+        store = self._make_store(["1", "2.1", "3p"])
+        compact = store.to_json(indent=False)
+        assert "\n" not in compact
+        assert len(compact) < len(store.to_json())
+        store2 = AnnotationStore()
+        store2.from_json(compact)
+        assert [a.number for a in store2.all_sorted()] == ["1", "2.1", "3p"]
+
+    def test_json_bytes_roundtrip(self):
+        store = self._make_store(["1", "2.1", "3p"])
+        blob = store.to_json_bytes()
+        assert isinstance(blob, bytes)
+        assert blob.decode() == store.to_json(indent=False)
+        store2 = AnnotationStore()
+        store2.from_json(blob)
+        assert [a.number for a in store2.all_sorted()] == ["1", "2.1", "3p"]
+
+    def test_to_json_matches_to_dict(self):
+        store = self._make_store(["1", "2.1"])
+        data = json.loads(store.to_json())
+        assert data == [a.to_dict() for a in store.all()]
+
     def test_modified_flag(self):
         store = AnnotationStore()
         store.modified = False
@@ -293,11 +456,13 @@ class TestStylePresets:
         assert loaded is not None
         assert loaded.font_size == 100
 
-    def test_get_returns_copy(self):
+    def test_get_returns_shared_immutable_style(self):
         p = StylePresets()
         s1 = p.get("Default")
         s2 = p.get("Default")
-        assert s1 is not s2
+        assert s1 is s2
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            s1.font_size = 99
 
     def test_delete(self):
         p = StylePresets()
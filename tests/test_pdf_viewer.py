@@ -0,0 +1,76 @@
+"""Tests for PDF annotation xref tracking across save and reload."""
+
+import os
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("PySide6")
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+from src.models import NumberAnnotation
+from src.pdf_viewer import PDFViewer
+
+
+@pytest.fixture
+def viewer(tmp_path):
+    app = QApplication.instance() or QApplication([])
+    path = tmp_path / "in.pdf"
+    doc = fitz.open()
+    doc.new_page()
+    doc.save(str(path))
+    doc.close()
+
+    viewer = PDFViewer()
+    assert viewer.open_document(str(path))
+    yield viewer
+    viewer.close_document()
+
+
+def _save_and_reload(viewer, path):
+    """Save the way MainWindow does for Save As, then reload."""
+    viewer.save_metadata_to_pdf()
+    viewer.get_document().save(str(path), garbage=4, deflate=True)
+    assert viewer.reload_document(str(path))
+
+
+def _name_of(doc, xref):
+    key_type, value = doc.xref_get_key(xref, "Name")
+    assert key_type == "name"
+    return value[1:]
+
+
+class TestXrefsAfterSave:
+    def test_identical_positions_matched_by_name(self, viewer, tmp_path):
+        first = NumberAnnotation(page=0, x=100, y=100, number="5")
+        second = NumberAnnotation(page=0, x=100, y=100, number="5")
+        viewer.add_annotation(first)
+        viewer.add_annotation(second)
+
+        _save_and_reload(viewer, tmp_path / "out.pdf")
+
+        doc = viewer.get_document()
+        store = viewer.get_annotations()
+        reloaded_first = store.get(first.id)
+        reloaded_second = store.get(second.id)
+        assert reloaded_first.pdf_annot_xref != reloaded_second.pdf_annot_xref
+        assert _name_of(doc, reloaded_first.pdf_annot_xref) == first.id
+        assert _name_of(doc, reloaded_second.pdf_annot_xref) == second.id
+
+    def test_delete_removes_own_object(self, viewer, tmp_path):
+        first = NumberAnnotation(page=0, x=100, y=100, number="5")
+        second = NumberAnnotation(page=0, x=100, y=100, number="5")
+        viewer.add_annotation(first)
+        viewer.add_annotation(second)
+
+        _save_and_reload(viewer, tmp_path / "out.pdf")
+
+        store = viewer.get_annotations()
+        viewer.delete_annotation(store.get(first.id))
+
+        doc = viewer.get_document()
+        page = doc.load_page(0)
+        names = [_name_of(doc, annot.xref)
+                 for annot in page.annots(types=(fitz.PDF_ANNOT_FREE_TEXT,))]
+        assert names == [second.id]
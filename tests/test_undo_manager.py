@@ -0,0 +1,126 @@
+"""Tests for the undo/redo manager."""
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import QCoreApplication
+from src.undo_manager import UndoAction, UndoManager
+
+
+@pytest.fixture(autouse=True)
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def make_action(log: list, name: str) -> UndoAction:
+    return UndoAction(
+        description=name,
+        undo_data=name,
+        redo_data=name,
+        undo_func=lambda d: log.append(("undo", d)),
+        redo_func=lambda d: log.append(("redo", d)),
+    )
+
+
+class TestPush:
+    def test_pending_action_can_be_undone(self):
+        manager = UndoManager()
+        manager.push(make_action([], "a"))
+        assert manager.can_undo()
+        assert manager.undo_description() == "a"
+
+    def test_undo_right_after_push(self):
+        log = []
+        manager = UndoManager()
+        manager.push(make_action(log, "a"))
+        assert manager.undo() == "a"
+        assert log == [("undo", "a")]
+        assert not manager.can_undo()
+        assert manager.can_redo()
+
+    def test_push_clears_redo(self):
+        log = []
+        manager = UndoManager()
+        manager.push(make_action(log, "a"))
+        manager.undo()
+        assert manager.can_redo()
+        manager.push(make_action(log, "b"))
+        # Redo is unavailable while the push is pending, and gone once committed
+        assert not manager.can_redo()
+        QCoreApplication.processEvents()
+        assert not manager.can_redo()
+        assert manager.redo() is None
+        assert manager.undo_description() == "b"
+
+    def test_state_after_timer(self):
+        manager = UndoManager()
+        emitted = []
+        manager.state_changed.connect(lambda: emitted.append(True))
+        manager.push(make_action([], "a"))
+        manager.push(make_action([], "b"))
+        assert emitted == []
+        QCoreApplication.processEvents()
+        # Both pushes committed with a single notification
+        assert emitted == [True]
+        assert manager.can_undo()
+        assert not manager.can_redo()
+        assert manager.undo_description() == "b"
+        assert manager.undo() == "b"
+        assert manager.undo() == "a"
+        assert manager.undo() is None
+
+
+class TestBatch:
+    def test_undo_emits_once(self):
+        manager = UndoManager()
+        manager.push(make_action([], "a"))
+        emitted = []
+        manager.state_changed.connect(lambda: emitted.append(True))
+        # Flushing the pending push and undoing it are reported together
+        manager.undo()
+        assert emitted == [True]
+
+    def test_nested_batch_emits_once_at_exit(self):
+        manager = UndoManager()
+        emitted = []
+        manager.state_changed.connect(lambda: emitted.append(True))
+        with manager.batch():
+            with manager.batch():
+                manager.clear()
+                manager.clear()
+            assert emitted == []
+        assert emitted == [True]
+
+    def test_batch_without_changes_does_not_emit(self):
+        manager = UndoManager()
+        emitted = []
+        manager.state_changed.connect(lambda: emitted.append(True))
+        with manager.batch():
+            pass
+        assert emitted == []
+
+
+class TestHistoryLimit:
+    def test_undo_history_is_bounded(self):
+        manager = UndoManager(max_history=3)
+        for name in "abcde":
+            manager.push(make_action([], name))
+        QCoreApplication.processEvents()
+        undone = []
+        while manager.can_undo():
+            undone.append(manager.undo())
+        # The oldest actions were dropped
+        assert undone == ["e", "d", "c"]
+
+    def test_redo_depth_after_undoing_everything(self):
+        manager = UndoManager(max_history=3)
+        for name in "abcde":
+            manager.push(make_action([], name))
+        QCoreApplication.processEvents()
+        while manager.can_undo():
+            manager.undo()
+        redone = []
+        while manager.can_redo():
+            redone.append(manager.redo())
+        assert redone == ["c", "d", "e"]